@@ -11,10 +11,21 @@ from core import scheduler
 from seeds.seed_state import seed_state
 from core import state as core_state
 from config import CONFIG as GLOBAL_CONFIG
+from events import OrjsonCodec
 
 
 # Use threading mode to avoid eventlet/gevent on Python 3.13
-socketio = SocketIO(async_mode='threading', cors_allowed_origins="*")
+socketio = SocketIO(async_mode='threading', cors_allowed_origins="*", json=OrjsonCodec)
+
+@socketio.on("connect")
+def _client_connected(auth=None):
+    with core_state.LOCK:
+        core_state.SUBSCRIBERS += 1
+
+@socketio.on("disconnect")
+def _client_disconnected(*_):
+    with core_state.LOCK:
+        core_state.SUBSCRIBERS -= 1
 
 def create_app():
     app = Flask(__name__)
@@ -25,8 +36,6 @@ def create_app():
     app.register_blueprint(economics_bp, url_prefix="/api")
     app.register_blueprint(solana_bp, url_prefix="/api")
     socketio.init_app(app)
-    seed_state()
-    socketio.init_app(app)
     core_state.init_globals(GLOBAL_CONFIG, socketio)
     seed_state()
     scheduler.start(socketio)
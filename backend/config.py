@@ -14,6 +14,7 @@ class Config:
     # Satellite task limits
     MAX_TASKS_PER_SAT: int = 30
     MIN_ENERGY_TO_ACCEPT: float = 10
+    MAX_TASKS_DRAINED_PER_TICK: int = 500        # Submitted tasks taken onto the pending queue per tick
     TASK_ENERGY_RATE: float = 0.10              
     TASK_PROGRESS_RATE: float = 0.02        
     
@@ -47,12 +48,19 @@ class Config:
     AUTO_DISPATCH_ENABLED: bool = True
     AUTO_NEEDY_THRESH: float = 25.0              # Auto-dispatch when sat below this
     AUTO_MAX_DRONES_PER_SAT: int = 2             # Max concurrent drones per satellite
+    MISSION_SEARCH_BACKOFF_MAX_TICKS: int = 4    # Cap on idle ticks between failed mission searches
     
     # Equilibrium calculation
     EQUILIBRIUM_CHECK_INTERVAL: int = 10         # Ticks between equilibrium checks
     EQUILIBRIUM_WINDOW_TICKS: int = 50           # Rolling window for energy trend
     EQUILIBRIUM_DISPATCH_THRESHOLD: float = -5.0 # Net energy loss triggering dispatch
     
+    # Push a state.tick delta to Socket.IO clients every tick
+    STATE_PUSH_ENABLED: bool = True
+    
+    # Debugging
+    DEBUG_VERIFY_COUNTS: bool = False            # Recount drone counters every tick and assert
+    
     def __post_init__(self):
         if self.WEIGHTS is None:
             self.WEIGHTS = dict(w1=0.35, w2=0.25, w3=0.20, w4=0.15, w5=0.05)
@@ -1,41 +1,83 @@
+from heapq import heapify, heappop, heappush
 from . import state
 from config import CONFIG
-from events import emit_event
+from events import TICK_EVENTS
 
-def _score(s, task):
+# Scoring constants, bound once (CONFIG is fixed for the life of the run)
+_MIN_E = CONFIG.MIN_ENERGY_TO_ACCEPT
+_MAX_T = CONFIG.MAX_TASKS_PER_SAT
+_W1, _W2, _W5 = CONFIG.WEIGHTS["w1"], CONFIG.WEIGHTS["w2"], CONFIG.WEIGHTS["w5"]
+_PR = {"low":0.0, "medium":0.5, "high":1.0}
+_DRAIN = CONFIG.MAX_TASKS_DRAINED_PER_TICK   # submitted tasks taken per tick
+
+def _base_score(s):
+    """Task-independent part of the score, or None if s can't take work"""
     # Must have some energy and not be at cap
-    if s.energy_amount < CONFIG.MIN_ENERGY_TO_ACCEPT: return -1e9
-    if len(s.current_tasks) >= CONFIG.MAX_TASKS_PER_SAT: return -1e9
+    if s.energy_amount < _MIN_E: return None
+    ntasks = len(s.current_tasks)
+    if ntasks >= _MAX_T: return None
 
     e = s.energy_amount / max(s.max_energy, 1.0)
-    spare = max(s.processing_capacity - task.processing_power_needed, 0) / max(s.processing_capacity, 1.0)
-    qpen = len(s.current_tasks) * 0.15
-    pr = {"low":0.0, "medium":0.5, "high":1.0}.get(task.priority, 0.0)
-    W = CONFIG.WEIGHTS
-    base = W["w1"]*e + W["w2"]*spare + W["w5"]*pr
-    return base - qpen
-
-def assign_pending(socketio):
-    with state.LOCK:
-        while state.TASK_QUEUE:
-            task = state.TASK_QUEUE[0]
-            best = None; bestScore = -1e9
-            for s in state.SATELLITES.values():
-                sc = _score(s, task)
-                if sc > bestScore:
-                    best = s; bestScore = sc
-            if not best or bestScore < -1e8:
-                # nobody can accept now; stop trying this tick
-                break
-
-            state.TASK_QUEUE.popleft()
-            best.current_tasks.append({
-                "task_id": task.task_id,
-                "remaining_energy": float(task.energy_need),
-                "progress": 0.0,
-                "pp_need": float(task.processing_power_needed),
-                "priority": task.priority
-            })
-            state.ASSIGNED[task.task_id] = best.satellite_id
-            emit_event(socketio, "task.assigned",
-                       {"task_id":task.task_id,"satellite_id":best.satellite_id})
+    qpen = ntasks * 0.15
+    return _W1*e - qpen
+
+def _heap_entry(s, base):
+    # (-base, id) orders the heap; the satellite and its capacity terms ride
+    # along so scoring a popped entry is plain arithmetic
+    cap = s.processing_capacity
+    return (-base, s.satellite_id, s, cap, 1.0 / max(cap, 1.0))
+
+def assign_pending_locked(socketio):
+    """Assign pending tasks to satellites; caller holds state.LOCK"""
+    # max-heap of eligible satellites keyed by their task-independent score
+    heap = []
+    for s in state.SATELLITES.values():
+        base = _base_score(s)
+        if base is not None:
+            heap.append(_heap_entry(s, base))
+    heapify(heap)
+
+    # bounded, so a submission flood can't stretch one tick; the rest
+    # waits in TASK_QUEUE for the next
+    state.drain_task_queue(_DRAIN)
+    pending = state.PENDING_TASKS
+    while pending:
+        task = pending[0]
+        # task-invariant terms, hoisted out of the per-satellite loop
+        pp_need = task.processing_power_needed
+        w5pr = _W5 * _PR.get(task.priority, 0.0)
+        # spare capacity adds at most w2, so stop popping once no
+        # remaining satellite can beat the best full score
+        bound = max(_W2, 0.0) + w5pr
+        best = None; bestScore = -1e9
+        popped = []
+        while heap and -heap[0][0] + bound > bestScore:
+            entry = heappop(heap)
+            popped.append(entry)
+            neg_base, _, s, cap, inv_cap = entry
+            spare = max(cap - pp_need, 0) * inv_cap
+            sc = _W2*spare + w5pr - neg_base
+            if sc > bestScore:
+                best = s; bestScore = sc
+        if not best:
+            # nobody can accept now; stop trying this tick
+            break
+
+        for entry in popped:
+            if entry[2] is not best:
+                heappush(heap, entry)
+
+        pending.popleft()
+        best.current_tasks.append({
+            "task_id": task.task_id,
+            "remaining_energy": float(task.energy_need),
+            "progress": 0.0,
+            "pp_need": float(task.processing_power_needed),
+            "priority": task.priority
+        })
+        state.ASSIGNED[task.task_id] = best.satellite_id
+        base = _base_score(best)
+        if base is not None:
+            heappush(heap, _heap_entry(best, base))
+        TICK_EVENTS.push("task.assigned",
+                         {"task_id":task.task_id,"satellite_id":best.satellite_id})
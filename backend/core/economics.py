@@ -2,43 +2,128 @@
 Economics Engine - Handles energy pricing, transactions, and financial metrics
 """
 
-from collections import deque
+from array import array
+from bisect import bisect_right
 from datetime import datetime
+from itertools import chain
+from operator import attrgetter, itemgetter
 from typing import Dict, List
 from . import state
 from .models import Transaction
-from events import emit_event
-import asyncio
+from events import TICK_EVENTS
 from .solana_integration import SOLANA
 import time
 
+# Utilization bucket edges and their price multipliers (scarcity -> premium)
+_BASE_PRICE = 0.05  # Base SOL per energy unit
+_UTIL_THRESHOLDS = (0.2, 0.4, 0.6, 0.8)
+_UTIL_MULTIPLIERS = (2.5, 1.8, 1.3, 1.0, 0.7)
+_UTIL_PRICES = tuple(_BASE_PRICE * m for m in _UTIL_MULTIPLIERS)
+
+_LEADERBOARD_SIZE = 3
+_by_revenue = attrgetter("total_revenue")
+_by_spent = attrgetter("total_spent")
+
+def _bump_top(board, entity, key):
+    """Keep board as the top entities by key (totals only ever grow)"""
+    if not any(e is entity for e in board):
+        if len(board) >= _LEADERBOARD_SIZE and key(entity) <= key(board[-1]):
+            return
+        board.append(entity)
+    board.sort(key=key, reverse=True)
+    del board[_LEADERBOARD_SIZE:]
+
+def _fill_top(board, entities, key):
+    """Pad a short leaderboard with not-yet-earning entities, as a full sort would"""
+    top = list(board)
+    if len(top) < _LEADERBOARD_SIZE:
+        rest = [e for e in entities if not any(e is t for t in top)]
+        rest.sort(key=key, reverse=True)
+        top.extend(rest[:_LEADERBOARD_SIZE - len(top)])
+    return top
+
+class TransactionLog:
+    """Fixed-size ring of recent transactions, stored column-wise"""
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._head = 0  # transactions ever appended; next slot is _head % capacity
+        zeros = bytes(8 * capacity)
+        self._timestamp = array("d", zeros)
+        self._energy = array("d", zeros)
+        self._price = array("d", zeros)
+        self._cost = array("d", zeros)
+        # (id, from_entity, from_company, from_wallet, to_entity, to_company, to_wallet, type, status)
+        self._text: List = [None] * capacity
+    
+    def __len__(self):
+        return min(self._head, self.capacity)
+    
+    def append(self, txn: Transaction):
+        i = self._head % self.capacity
+        self._timestamp[i] = txn.timestamp
+        self._energy[i] = txn.energy_amount
+        self._price[i] = txn.price_per_unit
+        self._cost[i] = txn.total_cost
+        self._text[i] = (txn.transaction_id, txn.from_entity_id, txn.from_company, txn.from_wallet,
+                         txn.to_entity_id, txn.to_company, txn.to_wallet,
+                         txn.transaction_type, txn.status)
+        self._head += 1
+    
+    def recent(self, n: int) -> List[Transaction]:
+        """Last n transactions, oldest first"""
+        # the window is one or two contiguous runs of ring slots
+        m = min(max(n, 0), len(self))
+        start = (self._head - m) % self.capacity
+        if start + m <= self.capacity:
+            slots = range(start, start + m)
+        else:
+            slots = chain(range(start, self.capacity), range(start + m - self.capacity))
+        out = []
+        for i in slots:
+            tid, from_id, from_co, from_w, to_id, to_co, to_w, ttype, status = self._text[i]
+            out.append(Transaction(
+                transaction_id=tid, timestamp=self._timestamp[i],
+                from_entity_id=from_id, from_company=from_co, from_wallet=from_w,
+                to_entity_id=to_id, to_company=to_co, to_wallet=to_w,
+                energy_amount=self._energy[i], price_per_unit=self._price[i],
+                total_cost=self._cost[i], transaction_type=ttype, status=status
+            ))
+        return out
+
 class EconomicsEngine:
     def __init__(self):
-        self.transactions: deque = deque(maxlen=1000)  # Last 1000 transactions
+        self.transactions = TransactionLog(1000)  # Last 1000 transactions
         self.total_volume_sol: float = 0.0
+        self._tick: int = 0
+        self._price_cache: Dict[str, tuple] = {}  # satellite_id -> (tick, price)
+        # Leaderboards maintained on each paid transfer so get_metrics is O(1)
+        self._top_sats: List = []
+        self._top_drones: List = []
+        self._sat_efficiency: Dict[str, tuple] = {}  # satellite_id -> (efficiency, satellite)
+        self._best_eff = None   # (efficiency, satellite)
+        self._worst_eff = None
+        
+    def next_tick(self):
+        """Advance the pricing clock; cached prices from earlier ticks go stale"""
+        self._tick += 1
         
     def calculate_dynamic_price(self, satellite) -> float:
         """
         Dynamic pricing based on satellite energy level
         Low energy = higher price (scarcity)w
         High energy = lower price (abundance)
+        Cached per satellite for the current tick
         """
-        base_price = 0.05  # Base SOL per energy unit
+        entry = self._price_cache.get(satellite.satellite_id)
+        if entry and entry[0] == self._tick:
+            return entry[1]
+        
         utilization = satellite.energy_amount / satellite.max_energy
         
         # Price increases as energy gets scarce
-        if utilization < 0.2:
-            multiplier = 2.5
-        elif utilization < 0.4:
-            multiplier = 1.8
-        elif utilization < 0.6:
-            multiplier = 1.3
-        elif utilization < 0.8:
-            multiplier = 1.0
-        else:
-            multiplier = 0.7  # Discount for abundant energy
-        
-        return base_price * multiplier
+        price = _UTIL_PRICES[bisect_right(_UTIL_THRESHOLDS, utilization)]
+        self._price_cache[satellite.satellite_id] = (self._tick, price)
+        return price
     
     def process_energy_transfer(self, from_sat, to_drone, amount: float, 
                                 transfer_type: str, socketio) -> Transaction:
@@ -84,12 +169,13 @@ class EconomicsEngine:
             to_drone.total_spent += total
             to_drone.total_energy_bought += amount
             self.total_volume_sol += total
+            self._update_leaderboards(from_sat, to_drone)
         
         # Record transaction
         self.transactions.append(txn)
         
         # Emit event
-        emit_event(socketio, "transaction.completed", {
+        TICK_EVENTS.push("transaction.completed", {
             "transaction_id": txn.transaction_id,
             "from": txn.from_company,
             "to": txn.to_company,
@@ -98,75 +184,76 @@ class EconomicsEngine:
             "type": transfer_type
         })
         if txn.total_cost > 0:  # Only record paid transactions
-            asyncio.create_task(
-                SOLANA.record_transaction(
-                    {
-                        "transaction_id": txn.transaction_id,
-                        "total_cost": txn.total_cost,
-                        "energy_amount": amount,
-                        "from": txn.from_company,
-                        "to": txn.to_company
-                    },
-                    socketio
-                )
+            # queued for the Solana worker thread; returns immediately
+            SOLANA.enqueue(
+                {
+                    "transaction_id": txn.transaction_id,
+                    "total_cost": txn.total_cost,
+                    "energy_amount": amount,
+                    "from": txn.from_company,
+                    "to": txn.to_company
+                },
+                socketio
             )
         return txn
     
+    def _update_leaderboards(self, sat, drone):
+        """Fold one paid transfer into the cached leaderboards"""
+        _bump_top(self._top_sats, sat, _by_revenue)
+        _bump_top(self._top_drones, drone, _by_spent)
+        
+        if sat.total_revenue <= 0:
+            return
+        eff = sat.total_energy_sold / sat.total_revenue
+        entry = (eff, sat)
+        self._sat_efficiency[sat.satellite_id] = entry
+        
+        best = self._best_eff
+        if best is None or eff > best[0]:
+            self._best_eff = entry
+        elif best[1] is sat:
+            # current leader slipped; rescan only the earning satellites
+            self._best_eff = max(self._sat_efficiency.values(), key=itemgetter(0))
+        
+        worst = self._worst_eff
+        if worst is None or eff < worst[0]:
+            self._worst_eff = entry
+        elif worst[1] is sat:
+            self._worst_eff = min(self._sat_efficiency.values(), key=itemgetter(0))
+    
     def get_metrics(self) -> Dict:
         """Calculate system-wide economic metrics"""
         with state.LOCK:
-            # Satellite metrics
-            sat_revenues = [(s.company_name, s.satellite_id, s.total_revenue, s.total_energy_sold) 
-                           for s in state.SATELLITES.values()]
-            sat_revenues.sort(key=lambda x: x[2], reverse=True)
-            
-            # Drone spending
-            drone_spending = [(d.company_name, d.battery_id, d.total_spent, d.total_energy_bought)
-                            for d in state.BATTERIES.values()]
-            drone_spending.sort(key=lambda x: x[2], reverse=True)
-            
-            # Calculate efficiency (energy sold per revenue)
-            most_efficient_sat = None
-            best_efficiency = 0
-            for s in state.SATELLITES.values():
-                if s.total_revenue > 0:
-                    efficiency = s.total_energy_sold / s.total_revenue
-                    if efficiency > best_efficiency:
-                        best_efficiency = efficiency
-                        most_efficient_sat = s
-            
-            least_efficient_sat = None
-            worst_efficiency = float('inf')
-            for s in state.SATELLITES.values():
-                if s.total_revenue > 0:
-                    efficiency = s.total_energy_sold / s.total_revenue
-                    if efficiency < worst_efficiency:
-                        worst_efficiency = efficiency
-                        least_efficient_sat = s
+            top_sats = _fill_top(self._top_sats, state.SATELLITES.values(), _by_revenue)
+            top_drones = _fill_top(self._top_drones, state.BATTERIES.values(), _by_spent)
+            best = self._best_eff
+            worst = self._worst_eff
             
             return {
                 "total_volume_sol": self.total_volume_sol,
                 "total_transactions": len(self.transactions),
                 "top_earning_satellites": [
-                    {"company": c, "id": sid, "revenue": r, "energy_sold": e}
-                    for c, sid, r, e in sat_revenues[:3]
+                    {"company": s.company_name, "id": s.satellite_id,
+                     "revenue": s.total_revenue, "energy_sold": s.total_energy_sold}
+                    for s in top_sats
                 ],
                 "top_spending_drones": [
-                    {"company": c, "id": did, "spent": s, "energy_bought": e}
-                    for c, did, s, e in drone_spending[:3]
+                    {"company": d.company_name, "id": d.battery_id,
+                     "spent": d.total_spent, "energy_bought": d.total_energy_bought}
+                    for d in top_drones
                 ],
                 "most_efficient_satellite": {
-                    "company": most_efficient_sat.company_name if most_efficient_sat else None,
-                    "id": most_efficient_sat.satellite_id if most_efficient_sat else None,
-                    "efficiency": best_efficiency,
-                    "revenue": most_efficient_sat.total_revenue if most_efficient_sat else 0
-                } if most_efficient_sat else None,
+                    "company": best[1].company_name,
+                    "id": best[1].satellite_id,
+                    "efficiency": best[0],
+                    "revenue": best[1].total_revenue
+                } if best else None,
                 "least_efficient_satellite": {
-                    "company": least_efficient_sat.company_name if least_efficient_sat else None,
-                    "id": least_efficient_sat.satellite_id if least_efficient_sat else None,
-                    "efficiency": worst_efficiency,
-                    "revenue": least_efficient_sat.total_revenue if least_efficient_sat else 0
-                } if least_efficient_sat else None,
+                    "company": worst[1].company_name,
+                    "id": worst[1].satellite_id,
+                    "efficiency": worst[0],
+                    "revenue": worst[1].total_revenue
+                } if worst else None,
                 "recent_transactions": [
                     {
                         "id": t.transaction_id,
@@ -176,7 +263,7 @@ class EconomicsEngine:
                         "cost": t.total_cost,
                         "timestamp": t.timestamp
                     }
-                    for t in list(self.transactions)[-10:]
+                    for t in self.transactions.recent(10)
                 ]
             }
 
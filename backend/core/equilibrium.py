@@ -9,138 +9,192 @@ Monitors:
 """
 
 from collections import deque
+from queue import Queue, Empty, Full
 from . import state
+import logging, threading
 from config import CONFIG
-from events import emit_event
+from events import TICK_EVENTS
+
+log = logging.getLogger("equilibrium")
+
+_TREND_TICKS = 10   # samples the trend and average utilization look back over
+
+# Shared recommendation payloads, never mutated. Kept as plain dicts (not
+# MappingProxyType) so orjson and jsonify can serialize them as-is.
+_MAINTAIN = {"action": "maintain", "reason": "monitoring"}
+_EQUILIBRIUM = {"action": "maintain", "reason": "equilibrium_achieved"}
+_DISPATCH_IDLE = {"action": "dispatch_idle", "reason": "critical_satellites_with_idle_drones"}
+_REDUCE_DRONES = {"action": "reduce_drones", "count": 1, "reason": "excess_capacity"}
+_ADD_DRONES = {}   # (count, total_needed, reason) -> payload
+
+def _add_drones(count, needed, reason):
+    key = (count, needed, reason)
+    rec = _ADD_DRONES.get(key)
+    if rec is None:
+        rec = _ADD_DRONES[key] = {
+            "action": "add_drones",
+            "count": count,
+            "total_needed": needed,
+            "reason": reason
+        }
+    return rec
 
 class EquilibriumMonitor:
     def __init__(self):
         self.energy_history = deque(maxlen=CONFIG.EQUILIBRIUM_WINDOW_TICKS)
         self.tick_count = 0
         self.last_recommendation = None
+        self._util_sum = 0.0        # utilization summed over the last _TREND_TICKS samples
+        self._critical_count = 0    # satellites below AUTO_NEEDY_THRESH at the last tick
+        # latest check inputs for the worker; a stale one is dropped, never queued
+        self._pending = Queue(maxsize=1)
+        self._worker = None
     
-    def record_tick(self, socketio):
-        """Record current system state"""
-        with state.LOCK:
-            # Calculate total system energy
-            total_energy = sum(s.energy_amount for s in state.SATELLITES.values())
-            total_capacity = sum(s.max_energy for s in state.SATELLITES.values())
-            
-            # Count active drones
-            active_drones = sum(1 for d in state.BATTERIES.values() 
-                              if d.status in ("charging", "enroute", "harvesting"))
-            idle_drones = sum(1 for d in state.BATTERIES.values() 
-                            if d.status in ("at_earth", "standby"))
-            
-            # Record state
-            self.energy_history.append({
-                "tick": self.tick_count,
-                "total_energy": total_energy,
-                "capacity": total_capacity,
-                "utilization": total_energy / max(total_capacity, 1),
-                "active_drones": active_drones,
-                "idle_drones": idle_drones
-            })
-            
-            self.tick_count += 1
-            
-            # Check equilibrium periodically
-            if self.tick_count % CONFIG.EQUILIBRIUM_CHECK_INTERVAL == 0:
-                self._check_equilibrium(socketio)
+    def start_worker(self):
+        """Evaluate recommendations on a background thread from here on"""
+        if self._worker is not None:
+            return
+        self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+        self._worker.start()
+    
+    def _worker_loop(self):
+        while True:
+            snap = self._pending.get()
+            try:
+                self._evaluate(snap)
+            except Exception:
+                # one bad check mustn't end recommendations for the run
+                log.exception("equilibrium check at tick %d failed", snap[0])
+    
+    def enqueue_snapshot(self, snap):
+        """Hand a check to the worker without blocking, replacing any unread one"""
+        try:
+            self._pending.put_nowait(snap)
+        except Full:
+            try:
+                self._pending.get_nowait()
+            except Empty:
+                pass  # worker took it meanwhile
+            self._pending.put_nowait(snap)
+    
+    def record_tick_locked(self, socketio):
+        """Record current system state; caller holds state.LOCK"""
+        # Calculate total system energy (one pass for both sums and the
+        # critical count, so _check_equilibrium needn't rescan satellites)
+        total_energy = total_capacity = 0.0
+        critical = 0
+        needy = CONFIG.AUTO_NEEDY_THRESH
+        for s in state.SATELLITES.values():
+            e = s.energy_amount
+            total_energy += e
+            total_capacity += s.max_energy
+            if e < needy:
+                critical += 1
+        self._critical_count = critical
+        
+        # Count active drones from the maintained status counters
+        counts = state.DRONE_STATUS
+        active_drones = counts["charging"] + counts["enroute"] + counts["harvesting"]
+        idle_drones = counts["at_earth"] + counts["standby"]
+        
+        # Record state, rolling the trend-window utilization sum forward
+        history = self.energy_history
+        utilization = total_energy / max(total_capacity, 1)
+        if len(history) >= _TREND_TICKS:
+            self._util_sum -= history[-_TREND_TICKS]["utilization"]
+        self._util_sum += utilization
+        history.append({
+            "tick": self.tick_count,
+            "total_energy": total_energy,
+            "capacity": total_capacity,
+            "utilization": utilization,
+            "active_drones": active_drones,
+            "idle_drones": idle_drones
+        })
+        
+        self.tick_count += 1
+        
+        # Check equilibrium periodically
+        if self.tick_count % CONFIG.EQUILIBRIUM_CHECK_INTERVAL == 0:
+            self._check_equilibrium(socketio)
     
     def _check_equilibrium(self, socketio):
-        """Analyze trends and emit recommendations"""
-        if len(self.energy_history) < 10:
+        """Capture trend inputs (caller holds state.LOCK) and hand them off"""
+        history = self.energy_history
+        if len(history) < _TREND_TICKS:
             return  # Need more data
         
-        with state.LOCK:
-            # Calculate energy trend
-            recent = list(self.energy_history)[-10:]
-            oldest = recent[0]["total_energy"]
-            newest = recent[-1]["total_energy"]
-            trend = newest - oldest
-            
-            # Calculate average utilization
-            avg_util = sum(r["utilization"] for r in recent) / len(recent)
-            
-            # Count satellites below threshold
-            critical_sats = sum(1 for s in state.SATELLITES.values() 
-                              if s.energy_amount < CONFIG.AUTO_NEEDY_THRESH)
-            
-            # Current drone count
-            total_drones = len(state.BATTERIES)
-            active = recent[-1]["active_drones"]
-            idle = recent[-1]["idle_drones"]
-            
-            # Determine recommendation
-            recommendation = self._calculate_drone_need(
-                trend, avg_util, critical_sats, total_drones, active, idle
-            )
-            
-            if recommendation != self.last_recommendation:
-                self.last_recommendation = recommendation
-                emit_event(socketio, "equilibrium.update", {
-                    "tick": self.tick_count,
-                    "energy_trend": trend,
-                    "avg_utilization": avg_util,
-                    "critical_satellites": critical_sats,
-                    "active_drones": active,
-                    "idle_drones": idle,
-                    "total_drones": total_drones,
-                    "recommendation": recommendation,
-                    "status": self._get_status(trend, avg_util, critical_sats)
-                })
+        # Calculate energy trend from the ends of the window (deque lookups
+        # near either end are cheap, no need to copy the history)
+        latest = history[-1]
+        trend = latest["total_energy"] - history[-_TREND_TICKS]["total_energy"]
+        
+        # Average utilization and critical count are kept by record_tick_locked
+        avg_util = self._util_sum / _TREND_TICKS
+        critical_sats = self._critical_count
+        
+        # Current drone count
+        total_drones = len(state.BATTERIES)
+        active = latest["active_drones"]
+        idle = latest["idle_drones"]
+        
+        snap = (self.tick_count, trend, avg_util, critical_sats,
+                total_drones, active, idle)
+        if self._worker is None:
+            self._evaluate(snap)
+        else:
+            self.enqueue_snapshot(snap)
+    
+    def _evaluate(self, snap):
+        """Turn captured trend inputs into a recommendation; needs no lock"""
+        tick, trend, avg_util, critical_sats, total_drones, active, idle = snap
+        
+        # Determine recommendation
+        recommendation = self._calculate_drone_need(
+            trend, avg_util, critical_sats, total_drones, active, idle
+        )
+        
+        # recommendations are shared constants, so identity is equality
+        if recommendation is not self.last_recommendation:
+            self.last_recommendation = recommendation
+            # queued for the next tick's batch when run on the worker
+            TICK_EVENTS.push("equilibrium.update", {
+                "tick": tick,
+                "energy_trend": trend,
+                "avg_utilization": avg_util,
+                "critical_satellites": critical_sats,
+                "active_drones": active,
+                "idle_drones": idle,
+                "total_drones": total_drones,
+                "recommendation": recommendation,
+                "status": self._get_status(trend, avg_util, critical_sats)
+            })
     
     def _calculate_drone_need(self, trend, avg_util, critical_sats, total, active, idle):
         """Calculate recommended drone count for equilibrium"""
         
         # Severe energy loss - need more drones
         if trend < CONFIG.EQUILIBRIUM_DISPATCH_THRESHOLD * 2:
-            needed = total + 2
-            return {
-                "action": "add_drones",
-                "count": 2,
-                "total_needed": needed,
-                "reason": "severe_energy_loss"
-            }
+            return _add_drones(2, total + 2, "severe_energy_loss")
         
         # Moderate energy loss - need 1 more drone
         if trend < CONFIG.EQUILIBRIUM_DISPATCH_THRESHOLD:
-            needed = total + 1
-            return {
-                "action": "add_drones",
-                "count": 1,
-                "total_needed": needed,
-                "reason": "moderate_energy_loss"
-            }
+            return _add_drones(1, total + 1, "moderate_energy_loss")
         
         # Critical satellites exist but drones are idle - deployment issue
         if critical_sats > 0 and idle > 0:
-            return {
-                "action": "dispatch_idle",
-                "reason": "critical_satellites_with_idle_drones"
-            }
+            return _DISPATCH_IDLE
         
         # System stable, high utilization - maintain current
         if 0.4 <= avg_util <= 0.7 and abs(trend) < 5:
-            return {
-                "action": "maintain",
-                "reason": "equilibrium_achieved"
-            }
+            return _EQUILIBRIUM
         
         # Excess drones (all idle, energy rising)
         if idle > 1 and trend > 10 and avg_util > 0.8:
-            return {
-                "action": "reduce_drones",
-                "count": 1,
-                "reason": "excess_capacity"
-            }
+            return _REDUCE_DRONES
         
         # Default: maintain current
-        return {
-            "action": "maintain",
-            "reason": "monitoring"
-        }
+        return _MAINTAIN
     
     def _get_status(self, trend, avg_util, critical_sats):
         """Get overall system status"""
@@ -1,77 +1,169 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
-import uuid, random, time
+from collections import defaultdict
+from dataclasses import dataclass, field, fields
+from itertools import count
+from operator import attrgetter
+from typing import List, Optional, Dict, get_args, get_origin
+import random, time
 
-def uid(prefix): return f"{prefix}-{uuid.uuid4().hex[:8]}"
+_COUNTERS: Dict[str, count] = defaultdict(count)   # prefix -> its id sequence
 
-class Task(BaseModel):
-    task_id: str = Field(default_factory=lambda: uid("task"))
+SAT_COMPANIES = ("OrbitPower Inc", "SkyGrid Energy", "SolarSat Systems", "NexGen Space")
+DRONE_COMPANIES = ("DroneFleet Co", "PowerShuttle Ltd", "Orbital Logistics", "Battery Express")
+
+def uid(prefix):
+    # per-prefix sequence, created on a prefix's first use; the C-level
+    # defaultdict miss and next() are atomic under the GIL
+    return f"{prefix}-{next(_COUNTERS[prefix]):08x}"
+
+_CONTAINERS = (list, dict)
+_DUMP_FIELDS: Dict[type, tuple] = {}   # model class -> public field names, in order
+_DUMP_KEYS: Dict[type, tuple] = {}     # model class -> (field getter, container field positions)
+
+def _is_container(tp):
+    """Whether a field annotation is (or may be, if Optional) a list or dict"""
+    return get_origin(tp) in _CONTAINERS or any(get_origin(a) in _CONTAINERS for a in get_args(tp))
+
+def _copy(v):
+    """Deep copy of the plain list/dict values models hold, as asdict() would"""
+    if type(v) is list:
+        return [_copy(x) if type(x) in _CONTAINERS else x for x in v]
+    return {k: _copy(x) if type(x) in _CONTAINERS else x for k, x in v.items()}
+
+class _Model:
+    """Pydantic-style model_dump() for the slotted sim models"""
+    __slots__ = ()
+    _GROUPS: Dict[str, Dict[str, str]] = {}   # wire key -> {nested key: flat field}
+
+    def model_dump(self) -> Dict:
+        # Same dict asdict() would give, minus its generic recursion: fields
+        # are read directly and only list/dict values are copied.
+        # Underscore fields are tick bookkeeping, not part of the wire format
+        cls = type(self)
+        names = _DUMP_FIELDS.get(cls)
+        if names is None:
+            names = _DUMP_FIELDS[cls] = tuple(f.name for f in fields(cls)
+                                              if not f.name.startswith("_"))
+        d = {}
+        for n in names:
+            v = getattr(self, n)
+            d[n] = _copy(v) if type(v) in _CONTAINERS else v
+        for key, names in self._GROUPS.items():
+            d[key] = {n: d.pop(f) for n, f in names.items()}
+        return d
+
+    def dump_key(self):
+        """The public field values, comparable across calls; equal keys mean
+        equal model_dump()s, for a fraction of the cost of building one"""
+        cls = type(self)
+        spec = _DUMP_KEYS.get(cls)
+        if spec is None:
+            fs = [f for f in fields(cls) if not f.name.startswith("_")]
+            spec = _DUMP_KEYS[cls] = (attrgetter(*(f.name for f in fs)),
+                                      tuple(i for i, f in enumerate(fs) if _is_container(f.type)))
+        getter, containers = spec
+        key = getter(self)
+        if containers:
+            # containers are mutated in place (task progress etc.), so the
+            # key holds copies
+            key = list(key)
+            for i in containers:
+                v = key[i]
+                if v is not None:
+                    key[i] = _copy(v)
+        return key
+
+@dataclass(slots=True, kw_only=True)
+class Task(_Model):
+    task_id: str = field(default_factory=lambda: uid("task"))
     energy_need: float
     processing_power_needed: float
     priority: str
-    created_at: float = Field(default_factory=time.time)
+    created_at: float = field(default_factory=time.time)
 
-class Satellite(BaseModel):
-    satellite_id: str = Field(default_factory=lambda: uid("sat"))
+@dataclass(slots=True, kw_only=True)
+class Satellite(_Model):
+    satellite_id: str = field(default_factory=lambda: uid("sat"))
     energy_amount: float                                 # current energy (0..max_energy)
     max_energy: float = 120.0                            # battery capacity cap
     # processing
     processing_capacity: float
-    current_tasks: List[Dict] = Field(default_factory=list)
+    current_tasks: List[Dict] = field(default_factory=list)
     # solar
     solar_gen_rate: float = 0.35                         # energy units per tick at full sun
-    # misc
-    position: Dict[str, float] = Field(default_factory=lambda: {
-        "lat": random.uniform(-60, 60), "lon": random.uniform(-180, 180)
-    })
+    # misc; coordinates are flat slots (hot in geometry), dumped as "position"
+    lat: float = field(default_factory=lambda: random.uniform(-60, 60))
+    lon: float = field(default_factory=lambda: random.uniform(-180, 180))
     giving_energy: str = "idle"
 
 
-    owner_wallet: str = Field(default_factory=lambda: f"wallet-{uuid.uuid4().hex[:12]}")
-    company_name: str = Field(default_factory=lambda: random.choice([
-        "OrbitPower Inc", "SkyGrid Energy", "SolarSat Systems", "NexGen Space"
-    ]))
-    energy_price_per_unit: float = Field(default=0.05)  
+    owner_wallet: str = field(default_factory=lambda: uid("wallet"))
+    company_name: str = field(default_factory=lambda: random.choice(SAT_COMPANIES))
+    energy_price_per_unit: float = 0.05
     total_revenue: float = 0.0
     total_energy_sold: float = 0.0
     total_energy_purchased: float = 0.0
 
-class Battery(BaseModel):
-    battery_id: str = Field(default_factory=lambda: uid("bat"))
+    _GROUPS = {"position": {"lat": "lat", "lon": "lon"}}
+
+    @property
+    def position(self) -> Dict[str, float]:
+        return {"lat": self.lat, "lon": self.lon}
+
+@dataclass(slots=True, kw_only=True)
+class Battery(_Model):
+    battery_id: str = field(default_factory=lambda: uid("bat"))
     reserve_battery: float
     battery: float
-    position: Dict[str, float] = Field(default_factory=lambda: {"lat":0,"lon":0,"alt":0})
+    lat: float = 0.0
+    lon: float = 0.0
+    alt: float = 0.0
     status: str = "standby"
     speed_km_per_tick: float = 4000
     target: Optional[Dict[str, str]] = None
     eta_ticks: int = 0
-    route: List[str] = Field(default_factory=list) 
-    home_base: Dict[str, float] = Field(default_factory=lambda: {"lat":0.0,"lon":0.0,"alt":0.0})
-    dwell_ticks: int = 0   
-
-    owner_wallet: str = Field(default_factory=lambda: f"wallet-{uuid.uuid4().hex[:12]}")
-    company_name: str = Field(default_factory=lambda: random.choice([
-        "DroneFleet Co", "PowerShuttle Ltd", "Orbital Logistics", "Battery Express"
-    ]))
+    route: List[str] = field(default_factory=list)
+    home_lat: float = 0.0
+    home_lon: float = 0.0
+    home_alt: float = 0.0
+    dwell_ticks: int = 0
+
+    owner_wallet: str = field(default_factory=lambda: uid("wallet"))
+    company_name: str = field(default_factory=lambda: random.choice(DRONE_COMPANIES))
     total_spent: float = 0.0
     total_energy_bought: float = 0.0
 
-class Transaction(BaseModel):
-    transaction_id: str = Field(default_factory=lambda: uid("txn"))
-    timestamp: float = Field(default_factory=time.time)
-    
+    _enroute_ticks: int = field(default=0, repr=False)   # ticks spent in transit (timeout guard)
+    _next_search_tick: int = field(default=0, repr=False)   # idle until this tick after a failed search
+    _search_backoff: int = field(default=1, repr=False)     # ticks to wait after the next failure
+
+    _GROUPS = {"position": {"lat": "lat", "lon": "lon", "alt": "alt"},
+               "home_base": {"lat": "home_lat", "lon": "home_lon", "alt": "home_alt"}}
+
+    @property
+    def position(self) -> Dict[str, float]:
+        return {"lat": self.lat, "lon": self.lon, "alt": self.alt}
+
+    @property
+    def home_base(self) -> Dict[str, float]:
+        return {"lat": self.home_lat, "lon": self.home_lon, "alt": self.home_alt}
+
+@dataclass(slots=True, kw_only=True)
+class Transaction(_Model):
+    transaction_id: str = field(default_factory=lambda: uid("txn"))
+    timestamp: float = field(default_factory=time.time)
+
     # Transaction details
     from_entity_id: str  # satellite or "earth"
     from_company: str
     from_wallet: str
-    
+
     to_entity_id: str  # drone battery_id
     to_company: str
     to_wallet: str
-    
+
     energy_amount: float
     price_per_unit: float
     total_cost: float  # in SOL
-    
+
     transaction_type: str  # "charge" or "harvest"
-    status: str = "completed"  # "pending", "completed", "failed"
\ No newline at end of file
+    status: str = "completed"  # "pending", "completed", "failed"
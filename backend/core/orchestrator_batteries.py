@@ -11,45 +11,72 @@ Key behaviors:
 - Timeout recovery: Drones stuck enroute return to Earth
 """
 
+import numpy as np
 from . import state
 from config import CONFIG
-from events import emit_event
-from utils.geo import haversine_km
+from events import TICK_EVENTS
+from utils.geo import geo_terms, haversine_km_cached, haversine_km_lru
 from .economics import ECONOMICS
 
+# Tuning constants, bound once (CONFIG is fixed for the life of the run)
+_AUTO_MAX_DRONES_PER_SAT = CONFIG.AUTO_MAX_DRONES_PER_SAT
+_AUTO_NEEDY_THRESH = CONFIG.AUTO_NEEDY_THRESH
+_DRONE_ENROUTE_MAX_TICKS = CONFIG.DRONE_ENROUTE_MAX_TICKS
+_DRONE_HARVEST_RATE = CONFIG.DRONE_HARVEST_RATE
+_DRONE_MAX_DWELL_TICKS = CONFIG.DRONE_MAX_DWELL_TICKS
+_DRONE_PAYLOAD_CHARGE_RATE = CONFIG.DRONE_PAYLOAD_CHARGE_RATE
+_DRONE_PAYLOAD_MAX = CONFIG.DRONE_PAYLOAD_MAX
+_DRONE_RESERVE_MAX = CONFIG.DRONE_RESERVE_MAX
+_DRONE_RESERVE_MIN_TO_CONTINUE = CONFIG.DRONE_RESERVE_MIN_TO_CONTINUE
+_DRONE_RESERVE_PER_KM = CONFIG.DRONE_RESERVE_PER_KM
+_DRONE_SPEED_KM_PER_TICK = CONFIG.DRONE_SPEED_KM_PER_TICK
+_DRONE_TRAVEL_INSTANT = CONFIG.DRONE_TRAVEL_INSTANT
+_HARVEST_FLOOR = CONFIG.HARVEST_FLOOR
+_HARVEST_START_LEVEL = CONFIG.HARVEST_START_LEVEL
+_PAYLOAD_CHARGE_MIN = CONFIG.PAYLOAD_CHARGE_MIN
+_SAT_FULL_EPS = CONFIG.SAT_FULL_EPS
+_SEARCH_BACKOFF_MAX = CONFIG.MISSION_SEARCH_BACKOFF_MAX_TICKS
 
-def _nearest_satellite(from_lat, from_lon, candidates):
-    """Find nearest satellite from given position"""
-    best, bestd = None, 1e18
-    for s in candidates:
-        d = haversine_km(from_lat, from_lon, s.position["lat"], s.position["lon"])
-        if d < bestd: 
-            best, bestd = s, d
-    return best, bestd
 
 def _reserve_cost_km(km):
     """Calculate reserve battery cost for distance"""
-    return km * CONFIG.DRONE_RESERVE_PER_KM
+    return km * _DRONE_RESERVE_PER_KM
 
-def _can_reach(drone, lat, lon, reserve_min=None):
-    """Check if drone has enough reserve to reach destination"""
-    if reserve_min is None:
-        reserve_min = CONFIG.DRONE_RESERVE_MIN_TO_CONTINUE
-    dkm = haversine_km(drone.position["lat"], drone.position["lon"], lat, lon)
-    need = _reserve_cost_km(dkm)
-    return drone.reserve_battery >= need + reserve_min
+# (lat, lon) -> distances to every satellite; cleared at the top of each
+# route tick. Keyed by position rather than drone, so a drone that moves is
+# simply a miss, and drones sharing a spot (e.g. Earth) share one row.
+_DIST_CACHE = {}
+
+def _sat_distances(drone):
+    """Distance (km) from drone to every satellite, indexed by state.SAT_INDEX"""
+    key = (drone.lat, drone.lon)
+    dists = _DIST_CACHE.get(key)
+    if dists is None:
+        dists = _DIST_CACHE[key] = haversine_km_cached(key[0], key[1], state.SAT_GEO)
+    return dists
+
+def _reachable(drone):
+    """Whether drone has the reserve to reach each satellite (keeping
+    DRONE_RESERVE_MIN_TO_CONTINUE), as one array op in SATELLITES order"""
+    return (drone.reserve_battery >= _reserve_cost_km(_sat_distances(drone))
+            + _DRONE_RESERVE_MIN_TO_CONTINUE).tolist()
 
 def _set_course(drone, lat, lon, label=None):
     """Set drone course to destination"""
-    drone.speed_km_per_tick = CONFIG.DRONE_SPEED_KM_PER_TICK
+    drone.speed_km_per_tick = _DRONE_SPEED_KM_PER_TICK
     
-    # Calculate and pay reserve cost
-    dkm = haversine_km(drone.position["lat"], drone.position["lon"], lat, lon)
+    # Calculate and pay reserve cost (satellite legs reuse the tick's distance row)
+    row = state.SAT_INDEX.get(label)
+    if row is not None:
+        dkm = float(_sat_distances(drone)[row])
+    else:
+        # Earth legs run between fixed points, so the pair repeats
+        dkm = haversine_km_lru(drone.lat, drone.lon, lat, lon)
     cost = _reserve_cost_km(dkm)
     drone.reserve_battery -= cost
     
     # Set travel mode
-    if CONFIG.DRONE_TRAVEL_INSTANT:
+    if _DRONE_TRAVEL_INSTANT:
         drone.eta_ticks = 0
     else:
         ticks = max(1, int(dkm / max(drone.speed_km_per_tick, 1)))
@@ -59,7 +86,7 @@ def _set_course(drone, lat, lon, label=None):
     drone._enroute_ticks = 0
     
     if label:
-        emit_event(state.SOCKETIO, "drone.enroute", {
+        TICK_EVENTS.push("drone.enroute", {
             "battery_id": drone.battery_id, 
             "eta": drone.eta_ticks, 
             "to": label
@@ -67,8 +94,8 @@ def _set_course(drone, lat, lon, label=None):
 
 def _arrive_at(drone, lat, lon):
     """Handle drone arrival at destination"""
-    drone.position["lat"] = lat
-    drone.position["lon"] = lon
+    drone.lat = lat
+    drone.lon = lon
     drone.eta_ticks = 0
     drone.dwell_ticks = 0
     drone._enroute_ticks = 0
@@ -78,22 +105,22 @@ def _release_current_claim(drone):
     if drone.target and "satellite_id" in drone.target:
         state.release_sat(drone.target["satellite_id"], drone.battery_id)
 
-def _tick_travel(drone, dest_position):
+def _tick_travel(drone, lat, lon):
     """Advance drone travel, return True if arrived, 'timeout' if stuck"""
-    if CONFIG.DRONE_TRAVEL_INSTANT:
-        _arrive_at(drone, dest_position["lat"], dest_position["lon"])
+    if _DRONE_TRAVEL_INSTANT:
+        _arrive_at(drone, lat, lon)
         return True
     
     if drone.eta_ticks > 0:
         drone.eta_ticks -= 1
-        drone._enroute_ticks = getattr(drone, "_enroute_ticks", 0) + 1
+        drone._enroute_ticks += 1
         
         # Check for timeout
-        if drone._enroute_ticks >= CONFIG.DRONE_ENROUTE_MAX_TICKS:
+        if drone._enroute_ticks >= _DRONE_ENROUTE_MAX_TICKS:
             return "timeout"
         
         if drone.eta_ticks == 0:
-            _arrive_at(drone, dest_position["lat"], dest_position["lon"])
+            _arrive_at(drone, lat, lon)
             return True
     
     return False
@@ -101,25 +128,25 @@ def _tick_travel(drone, dest_position):
 def _find_charging_target(drone):
     """Find the best satellite to charge (lowest energy, not being charged by multiple drones)"""
     candidates = []
+    own_sid = drone.target.get("satellite_id") if drone.target else None
     
-    for s in state.SATELLITES.values():
+    for (sid, s), reachable in zip(state.SATELLITES.items(), _reachable(drone)):
         # Skip if at full capacity
-        if s.energy_amount >= s.max_energy - CONFIG.SAT_FULL_EPS:
+        if s.energy_amount >= s.max_energy - _SAT_FULL_EPS:
             continue
         
         # Check if we can reach it
-        if not _can_reach(drone, s.position["lat"], s.position["lon"]):
+        if not reachable:
             continue
         
-        # Count how many drones are already charging this satellite
-        charging_count = 0
-        for b in state.BATTERIES.values():
-            if b.battery_id != drone.battery_id and b.status == "charging" and \
-               b.target and b.target.get("satellite_id") == s.satellite_id:
-                charging_count += 1
+        # Drones already charging this satellite (maintained count, minus
+        # this drone if it is one of them)
+        charging_count = state.CHARGING_COUNT[sid]
+        if sid == own_sid and drone.status == "charging":
+            charging_count -= 1
         
         # Skip if already at max concurrent chargers
-        if charging_count >= CONFIG.AUTO_MAX_DRONES_PER_SAT:
+        if charging_count >= _AUTO_MAX_DRONES_PER_SAT:
             continue
         
         candidates.append((s, charging_count))
@@ -127,41 +154,31 @@ def _find_charging_target(drone):
     if not candidates:
         return None
     
-    # Sort by energy (lowest first), then by charging count (prefer less crowded)
-    candidates.sort(key=lambda x: (x[0].energy_amount, x[1]))
-    return candidates[0][0]
+    # Lowest energy first, then lowest charging count (prefer less crowded)
+    return min(candidates, key=lambda x: (x[0].energy_amount, x[1]))[0]
 
 def _find_harvest_source(drone):
     """Find best satellite to harvest from (highest energy above threshold, not being siphoned)"""
     candidates = []
+    own_sid = drone.target.get("satellite_id") if drone.target else None
     
-    for s in state.SATELLITES.values():
+    for (sid, s), reachable in zip(state.SATELLITES.items(), _reachable(drone)):
         # Must be above harvest start level
-        if s.energy_amount < CONFIG.HARVEST_START_LEVEL:
+        if s.energy_amount < _HARVEST_START_LEVEL:
             continue
         
         # Check if we can reach it
-        if not _can_reach(drone, s.position["lat"], s.position["lon"]):
+        if not reachable:
             continue
         
         # Don't harvest from satellites being charged
-        being_charged = False
-        for b in state.BATTERIES.values():
-            if b.status == "charging" and b.target and \
-               b.target.get("satellite_id") == s.satellite_id:
-                being_charged = True
-                break
-        
-        if being_charged:
+        if state.CHARGING_COUNT[sid]:
             continue
         
         # Don't allow multiple drones to harvest from same satellite
-        harvesting_count = 0
-        for b in state.BATTERIES.values():
-            if b.battery_id != drone.battery_id and b.status == "harvesting" and \
-               b.target and b.target.get("satellite_id") == s.satellite_id:
-                harvesting_count += 1
-        
+        harvesting_count = state.HARVESTING_COUNT[sid]
+        if sid == own_sid and drone.status == "harvesting":
+            harvesting_count -= 1
         if harvesting_count > 0:
             continue
         
@@ -173,56 +190,60 @@ def _find_harvest_source(drone):
     # Return highest energy satellite
     return max(candidates, key=lambda s: s.energy_amount)
 
-def _should_go_to_earth(drone):
-    """Determine if drone should return to Earth for recharge"""
-    # Low payload and low reserve - must go to Earth
-    if drone.battery < CONFIG.PAYLOAD_CHARGE_MIN and \
-       drone.reserve_battery < CONFIG.DRONE_RESERVE_MIN_TO_CONTINUE * 2:
-        return True
-    
-    # Payload is low - need to refill
-    if drone.battery < CONFIG.PAYLOAD_CHARGE_MIN:
-        # Check if any satellite can provide enough energy
-        harvest_source = _find_harvest_source(drone)
-        if harvest_source:
-            return False  # Can harvest from satellite
-        return True  # Must go to Earth
-    
-    return False
+def _go_to_earth(drone):
+    """Release any claim and head home to recharge"""
+    _release_current_claim(drone)
+    state.set_drone_status(drone, "returning")
+    state.set_drone_target(drone, {"earth": True})
+    _set_course(drone, drone.home_lat, drone.home_lon, label="earth")
 
 def _choose_next_mission(drone):
     """Decide drone's next mission: charge satellite, harvest, or return to Earth"""
     
-    # First check if we need to go to Earth
-    if _should_go_to_earth(drone):
-        _release_current_claim(drone)
-        drone.status = "returning"
-        drone.target = {"earth": True}
-        _set_course(drone, drone.home_base["lat"], drone.home_base["lon"], label="earth")
-        return
-    
-    # If we have payload, prioritize charging
-    if drone.battery >= CONFIG.PAYLOAD_CHARGE_MIN:
+    if drone.battery < _PAYLOAD_CHARGE_MIN:
+        # Payload is low - need to refill. With low reserve too we must go to
+        # Earth; otherwise harvest if any satellite can provide the energy.
+        # The source found here is the one used below, not searched twice.
+        harvest_source = None
+        if drone.reserve_battery >= _DRONE_RESERVE_MIN_TO_CONTINUE * 2:
+            harvest_source = _find_harvest_source(drone)
+        if harvest_source is None:
+            _go_to_earth(drone)
+            return
+    else:
+        # If we have payload, prioritize charging
         target = _find_charging_target(drone)
         if target and state.try_claim_sat(target.satellite_id, drone.battery_id):
-            drone.status = "enroute"
-            drone.target = {"satellite_id": target.satellite_id}
-            _set_course(drone, target.position["lat"], target.position["lon"], label=target.satellite_id)
+            state.set_drone_status(drone, "enroute")
+            state.set_drone_target(drone, {"satellite_id": target.satellite_id})
+            _set_course(drone, target.lat, target.lon, label=target.satellite_id)
+            drone._search_backoff = 1
             return
+        harvest_source = _find_harvest_source(drone)
     
     # Otherwise, try to harvest
-    target = _find_harvest_source(drone)
+    target = harvest_source
     if target and state.try_claim_sat(target.satellite_id, drone.battery_id):
-        drone.status = "enroute"
-        drone.target = {"satellite_id": target.satellite_id}
-        _set_course(drone, target.position["lat"], target.position["lon"], label=target.satellite_id)
+        state.set_drone_status(drone, "enroute")
+        state.set_drone_target(drone, {"satellite_id": target.satellite_id})
+        _set_course(drone, target.lat, target.lon, label=target.satellite_id)
+        drone._search_backoff = 1
         return
     
-    # No mission available, return to Earth
-    _release_current_claim(drone)
-    drone.status = "returning"
-    drone.target = {"earth": True}
-    _set_course(drone, drone.home_base["lat"], drone.home_base["lon"], label="earth")
+    # No mission available, return to Earth. Nothing will turn up until
+    # satellite energy moves, so back off searching: 1, 2, 4... ticks
+    drone._next_search_tick = state.TICK_COUNTER + drone._search_backoff
+    drone._search_backoff = min(drone._search_backoff * 2, _SEARCH_BACKOFF_MAX)
+    _go_to_earth(drone)
+
+def _search_due(drone):
+    return state.TICK_COUNTER >= drone._next_search_tick
+
+def _flag_crossing(sat, old):
+    """Set SATS_CHANGED if a transfer moved sat's energy from old across
+    AUTO_NEEDY_THRESH, as the satellite tick does for its own changes"""
+    if (old < _AUTO_NEEDY_THRESH) != (sat.energy_amount < _AUTO_NEEDY_THRESH):
+        state.SATS_CHANGED = True
 
 def _auto_dispatch():
     """Automatically dispatch idle drones to needy satellites"""
@@ -231,7 +252,7 @@ def _auto_dispatch():
     
     # Find satellites below threshold
     needy = [s for s in state.SATELLITES.values() 
-             if s.energy_amount < CONFIG.AUTO_NEEDY_THRESH]
+             if s.energy_amount < _AUTO_NEEDY_THRESH]
     
     if not needy:
         return
@@ -239,247 +260,265 @@ def _auto_dispatch():
     # Sort by energy (lowest first)
     needy.sort(key=lambda s: s.energy_amount)
     
-    # Find available drones
-    available_drones = [b for b in state.BATTERIES.values() 
-                       if b.status in ("at_earth", "standby") and 
-                       b.battery >= CONFIG.PAYLOAD_CHARGE_MIN]
+    # Find available drones (only the idle buckets, not the whole fleet)
+    by_status = state.DRONES_BY_STATUS
+    available_drones = [b for status in ("at_earth", "standby")
+                        for b in by_status[status].values()
+                        if b.battery >= _PAYLOAD_CHARGE_MIN]
+    
+    if not available_drones:
+        return
+    
+    # Drone positions (as radians/cos terms, converted once for every needy
+    # satellite) and reserves as arrays, so each needy satellite is one
+    # vectorized distance query instead of a per-drone loop
+    drone_terms = geo_terms([b.lat for b in available_drones],
+                            [b.lon for b in available_drones])
+    reserves = np.array([b.reserve_battery for b in available_drones])
+    dispatched = np.zeros(len(available_drones), dtype=bool)
     
     # Dispatch drones to needy satellites
     for sat in needy:
-        if not available_drones:
+        if dispatched.all():
             break
         
         # Check how many drones already targeting this satellite
-        targeting_count = sum(1 for b in state.BATTERIES.values() 
-                            if b.target and b.target.get("satellite_id") == sat.satellite_id)
-        
-        if targeting_count >= CONFIG.AUTO_MAX_DRONES_PER_SAT:
+        if state.TARGETING_COUNT[sat.satellite_id] >= _AUTO_MAX_DRONES_PER_SAT:
             continue
         
-        # Find closest available drone
-        closest_drone = None
-        closest_dist = 1e18
-        
-        for drone in available_drones:
-            if not _can_reach(drone, sat.position["lat"], sat.position["lon"]):
-                continue
-            
-            dist = haversine_km(drone.position["lat"], drone.position["lon"],
-                              sat.position["lat"], sat.position["lon"])
-            if dist < closest_dist:
-                closest_drone = drone
-                closest_dist = dist
+        # Find closest available drone that can reach it
+        dists = haversine_km_cached(sat.lat, sat.lon, drone_terms)
+        reachable = ~dispatched & (reserves >= _reserve_cost_km(dists) + _DRONE_RESERVE_MIN_TO_CONTINUE)
+        if not reachable.any():
+            continue
+        i = int(np.argmin(np.where(reachable, dists, np.inf)))
+        closest_drone = available_drones[i]
         
-        if closest_drone and state.try_claim_sat(sat.satellite_id, closest_drone.battery_id):
-            closest_drone.status = "enroute"
-            closest_drone.target = {"satellite_id": sat.satellite_id}
-            _set_course(closest_drone, sat.position["lat"], sat.position["lon"], 
+        if state.try_claim_sat(sat.satellite_id, closest_drone.battery_id):
+            state.set_drone_status(closest_drone, "enroute")
+            state.set_drone_target(closest_drone, {"satellite_id": sat.satellite_id})
+            _set_course(closest_drone, sat.lat, sat.lon, 
                        label=sat.satellite_id)
-            available_drones.remove(closest_drone)
+            dispatched[i] = True
+            closest_drone._search_backoff = 1
             
-            emit_event(state.SOCKETIO, "drone.auto_dispatched", {
+            TICK_EVENTS.push("drone.auto_dispatched", {
                 "battery_id": closest_drone.battery_id,
                 "satellite_id": sat.satellite_id,
                 "reason": "low_energy"
             })
 
-def route(socketio):
-    """Main drone orchestration loop"""
-    with state.LOCK:
-        # Auto-dispatch idle drones first
-        _auto_dispatch()
-        
+def route_locked(socketio):
+    """Main drone orchestration loop; caller holds state.LOCK"""
+    if CONFIG.DEBUG_VERIFY_COUNTS:
+        state.verify_drone_counts()
+    _DIST_CACHE.clear()
+    if state.SATS_CHANGED:
+        # supply changed; backed-off drones search again this tick
         for drone in state.BATTERIES.values():
-            if drone.status == "out_of_service":
-                continue
-            
-            # Handle travel states
-            if drone.status in ("enroute", "returning"):
-                if drone.target and drone.target.get("earth"):
-                    # Traveling to Earth
-                    result = _tick_travel(drone, drone.home_base)
-                    if result == True:
-                        # Arrived at Earth - full recharge
-                        drone.status = "at_earth"
-                        drone.battery = CONFIG.DRONE_PAYLOAD_MAX
-                        drone.reserve_battery = CONFIG.DRONE_RESERVE_MAX
-                        ECONOMICS.process_energy_transfer(
-                            from_sat=None,
-                            to_drone=drone,
-                            amount=CONFIG.DRONE_PAYLOAD_MAX,
-                            transfer_type="earth_recharge",
-                            socketio=socketio
-                        )
-                        drone.target = None
-                        emit_event(socketio, "drone.recharged", {
-                            "battery_id": drone.battery_id
-                        })
-                        # Immediately look for next mission
-                        _choose_next_mission(drone)
-                    elif result == "timeout":
-                        # Stuck enroute - force return to Earth
-                        _release_current_claim(drone)
-                        drone.status = "returning"
-                        drone.target = {"earth": True}
-                        drone.position = drone.home_base.copy()  # Teleport to Earth
-                        drone.battery = CONFIG.DRONE_PAYLOAD_MAX
-                        drone.reserve_battery = CONFIG.DRONE_RESERVE_MAX
-                        emit_event(socketio, "drone.timeout_recovery", {
-                            "battery_id": drone.battery_id
-                        })
-                    continue
-                
-                elif drone.target and "satellite_id" in drone.target:
-                    # Traveling to satellite
-                    sat = state.SATELLITES.get(drone.target["satellite_id"])
-                    if not sat:
-                        _release_current_claim(drone)
-                        _choose_next_mission(drone)
-                        continue
-                    
-                    result = _tick_travel(drone, sat.position)
-                    if result == True:
-                        # Arrived at satellite - determine mode
-                        if drone.battery >= CONFIG.PAYLOAD_CHARGE_MIN and \
-                           sat.energy_amount < sat.max_energy - CONFIG.SAT_FULL_EPS:
-                            drone.status = "charging"
-                            drone.dwell_ticks = 0
-                            emit_event(socketio, "drone.charging_start", {
-                                "battery_id": drone.battery_id,
-                                "satellite_id": sat.satellite_id
-                            })
-                        elif sat.energy_amount >= CONFIG.HARVEST_START_LEVEL:
-                            drone.status = "harvesting"
-                            drone.dwell_ticks = 0
-                            emit_event(socketio, "drone.harvesting_start", {
-                                "battery_id": drone.battery_id,
-                                "satellite_id": sat.satellite_id
-                            })
-                        else:
-                            # Satellite not suitable - find new mission
-                            _release_current_claim(drone)
-                            _choose_next_mission(drone)
-                    elif result == "timeout":
-                        # Stuck enroute - return to Earth
-                        _release_current_claim(drone)
-                        drone.status = "returning"
-                        drone.target = {"earth": True}
-                        drone.position = drone.home_base.copy()  # Teleport to Earth
-                        drone.battery = CONFIG.DRONE_PAYLOAD_MAX
-                        drone.reserve_battery = CONFIG.DRONE_RESERVE_MAX
-                        emit_event(socketio, "drone.timeout_recovery", {
-                            "battery_id": drone.battery_id
-                        })
-                    continue
-            
-            # Handle charging mode
-            if drone.status == "charging":
-                if not drone.target or "satellite_id" not in drone.target:
-                    _choose_next_mission(drone)
-                    continue
-                
-                sat = state.SATELLITES.get(drone.target["satellite_id"])
-                if not sat:
-                    _release_current_claim(drone)
-                    _choose_next_mission(drone)
-                    continue
-                
-                drone.dwell_ticks += 1
-                
-                # Check if we should stop charging
-                sat_full = sat.energy_amount >= sat.max_energy - CONFIG.SAT_FULL_EPS
-                payload_empty = drone.battery < CONFIG.PAYLOAD_CHARGE_MIN
-                max_dwell = drone.dwell_ticks >= CONFIG.DRONE_MAX_DWELL_TICKS
-                
-                if sat_full or payload_empty or max_dwell:
-                    # Done charging - release and find new mission
-                    emit_event(socketio, "drone.charging_complete", {
-                        "battery_id": drone.battery_id,
-                        "satellite_id": sat.satellite_id,
-                        "reason": "full" if sat_full else "empty" if payload_empty else "max_dwell"
-                    })
-                    _release_current_claim(drone)
-                    _choose_next_mission(drone)
-                    continue
-                
-                # Transfer energy
-                deficit = sat.max_energy - sat.energy_amount
-                give = min(CONFIG.DRONE_PAYLOAD_CHARGE_RATE, drone.battery, deficit)
-                
-                if give > 0:
-                    drone.battery -= give
-                    sat.energy_amount += give
-                    
-                    # Process transaction
+            drone._next_search_tick = 0
+            drone._search_backoff = 1
+        state.SATS_CHANGED = False
+    
+    # Auto-dispatch idle drones first
+    _auto_dispatch()
+    
+    for drone in state.BATTERIES.values():
+        if drone.status == "out_of_service":
+            continue
+        
+        # Handle travel states
+        if drone.status in ("enroute", "returning"):
+            if drone.target and drone.target.get("earth"):
+                # Traveling to Earth
+                result = _tick_travel(drone, drone.home_lat, drone.home_lon)
+                if result == True:
+                    # Arrived at Earth - full recharge
+                    state.set_drone_status(drone, "at_earth")
+                    drone.battery = _DRONE_PAYLOAD_MAX
+                    drone.reserve_battery = _DRONE_RESERVE_MAX
                     ECONOMICS.process_energy_transfer(
-                        from_sat=None,  # Drone is GIVING to satellite (drone paid at Earth)
+                        from_sat=None,
                         to_drone=drone,
-                        amount=give,
-                        transfer_type="charge",
+                        amount=_DRONE_PAYLOAD_MAX,
+                        transfer_type="earth_recharge",
                         socketio=socketio
                     )
-                    
-                    emit_event(socketio, "drone.charged", {
-                        "battery_id": drone.battery_id,
-                        "satellite_id": sat.satellite_id,
-                        "amount": give
+                    state.set_drone_target(drone, None)
+                    TICK_EVENTS.push("drone.recharged", {
+                        "battery_id": drone.battery_id
                     })
+                    # Immediately look for next mission, unless backing off
+                    if _search_due(drone):
+                        _choose_next_mission(drone)
+                elif result == "timeout":
+                    # Stuck enroute - force return to Earth
+                    _release_current_claim(drone)
+                    state.set_drone_status(drone, "returning")
+                    state.set_drone_target(drone, {"earth": True})
+                    drone.lat, drone.lon, drone.alt = drone.home_lat, drone.home_lon, drone.home_alt  # Teleport to Earth
+                    drone.battery = _DRONE_PAYLOAD_MAX
+                    drone.reserve_battery = _DRONE_RESERVE_MAX
+                    TICK_EVENTS.push("drone.timeout_recovery", {
+                        "battery_id": drone.battery_id
+                    })
+                continue
             
-            # Handle harvesting mode
-            if drone.status == "harvesting":
-                if not drone.target or "satellite_id" not in drone.target:
-                    _choose_next_mission(drone)
-                    continue
-                
+            elif drone.target and "satellite_id" in drone.target:
+                # Traveling to satellite
                 sat = state.SATELLITES.get(drone.target["satellite_id"])
                 if not sat:
                     _release_current_claim(drone)
                     _choose_next_mission(drone)
                     continue
                 
-                drone.dwell_ticks += 1
-                
-                # Check if we should stop harvesting
-                sat_low = sat.energy_amount <= CONFIG.HARVEST_FLOOR
-                payload_full = drone.battery >= CONFIG.DRONE_PAYLOAD_MAX - 1
-                max_dwell = drone.dwell_ticks >= CONFIG.DRONE_MAX_DWELL_TICKS
-                
-                if sat_low or payload_full or max_dwell:
-                    # Done harvesting - release and find new mission
-                    emit_event(socketio, "drone.harvesting_complete", {
-                        "battery_id": drone.battery_id,
-                        "satellite_id": sat.satellite_id,
-                        "reason": "low" if sat_low else "full" if payload_full else "max_dwell"
-                    })
+                result = _tick_travel(drone, sat.lat, sat.lon)
+                if result == True:
+                    # Arrived at satellite - determine mode
+                    if drone.battery >= _PAYLOAD_CHARGE_MIN and \
+                       sat.energy_amount < sat.max_energy - _SAT_FULL_EPS:
+                        state.set_drone_status(drone, "charging")
+                        drone.dwell_ticks = 0
+                        TICK_EVENTS.push("drone.charging_start", {
+                            "battery_id": drone.battery_id,
+                            "satellite_id": sat.satellite_id
+                        })
+                    elif sat.energy_amount >= _HARVEST_START_LEVEL:
+                        state.set_drone_status(drone, "harvesting")
+                        drone.dwell_ticks = 0
+                        TICK_EVENTS.push("drone.harvesting_start", {
+                            "battery_id": drone.battery_id,
+                            "satellite_id": sat.satellite_id
+                        })
+                    else:
+                        # Satellite not suitable - find new mission
+                        _release_current_claim(drone)
+                        _choose_next_mission(drone)
+                elif result == "timeout":
+                    # Stuck enroute - return to Earth
                     _release_current_claim(drone)
-                    _choose_next_mission(drone)
-                    continue
+                    state.set_drone_status(drone, "returning")
+                    state.set_drone_target(drone, {"earth": True})
+                    drone.lat, drone.lon, drone.alt = drone.home_lat, drone.home_lon, drone.home_alt  # Teleport to Earth
+                    drone.battery = _DRONE_PAYLOAD_MAX
+                    drone.reserve_battery = _DRONE_RESERVE_MAX
+                    TICK_EVENTS.push("drone.timeout_recovery", {
+                        "battery_id": drone.battery_id
+                    })
+                continue
+        
+        # Handle charging mode
+        if drone.status == "charging":
+            if not drone.target or "satellite_id" not in drone.target:
+                _choose_next_mission(drone)
+                continue
+            
+            sat = state.SATELLITES.get(drone.target["satellite_id"])
+            if not sat:
+                _release_current_claim(drone)
+                _choose_next_mission(drone)
+                continue
+            
+            drone.dwell_ticks += 1
+            
+            # Check if we should stop charging
+            sat_full = sat.energy_amount >= sat.max_energy - _SAT_FULL_EPS
+            payload_empty = drone.battery < _PAYLOAD_CHARGE_MIN
+            max_dwell = drone.dwell_ticks >= _DRONE_MAX_DWELL_TICKS
+            
+            if sat_full or payload_empty or max_dwell:
+                # Done charging - release and find new mission
+                TICK_EVENTS.push("drone.charging_complete", {
+                    "battery_id": drone.battery_id,
+                    "satellite_id": sat.satellite_id,
+                    "reason": "full" if sat_full else "empty" if payload_empty else "max_dwell"
+                })
+                _release_current_claim(drone)
+                _choose_next_mission(drone)
+                continue
+            
+            # Transfer energy
+            deficit = sat.max_energy - sat.energy_amount
+            give = min(_DRONE_PAYLOAD_CHARGE_RATE, drone.battery, deficit)
+            
+            if give > 0:
+                drone.battery -= give
+                old = sat.energy_amount
+                sat.energy_amount += give
+                _flag_crossing(sat, old)
                 
-                # Extract energy
-                available = max(0.0, sat.energy_amount - CONFIG.HARVEST_FLOOR)
-                take = min(CONFIG.DRONE_HARVEST_RATE,
-                          CONFIG.DRONE_PAYLOAD_MAX - drone.battery,
-                          available)
+                # Process transaction
+                ECONOMICS.process_energy_transfer(
+                    from_sat=None,  # Drone is GIVING to satellite (drone paid at Earth)
+                    to_drone=drone,
+                    amount=give,
+                    transfer_type="charge",
+                    socketio=socketio
+                )
                 
-                if take > 0:
-                    drone.battery += take
-                    sat.energy_amount -= take
-                    
-                    # Process transaction - drone pays satellite
-                    ECONOMICS.process_energy_transfer(
-                        from_sat=sat,
-                        to_drone=drone,
-                        amount=take,
-                        transfer_type="harvest",
-                        socketio=socketio
-                    )
-                    
-                    emit_event(socketio, "drone.harvested", {
-                        "battery_id": drone.battery_id,
-                        "satellite_id": sat.satellite_id,
-                        "amount": take
-                    })
+                TICK_EVENTS.push("drone.charged", {
+                    "battery_id": drone.battery_id,
+                    "satellite_id": sat.satellite_id,
+                    "amount": give
+                })
+        
+        # Handle harvesting mode
+        if drone.status == "harvesting":
+            if not drone.target or "satellite_id" not in drone.target:
+                _choose_next_mission(drone)
+                continue
+            
+            sat = state.SATELLITES.get(drone.target["satellite_id"])
+            if not sat:
+                _release_current_claim(drone)
+                _choose_next_mission(drone)
+                continue
+            
+            drone.dwell_ticks += 1
+            
+            # Check if we should stop harvesting
+            sat_low = sat.energy_amount <= _HARVEST_FLOOR
+            payload_full = drone.battery >= _DRONE_PAYLOAD_MAX - 1
+            max_dwell = drone.dwell_ticks >= _DRONE_MAX_DWELL_TICKS
             
-            # Handle idle drones
-            if drone.status in ("standby", "at_earth") and not drone.target:
-                _choose_next_mission(drone)
\ No newline at end of file
+            if sat_low or payload_full or max_dwell:
+                # Done harvesting - release and find new mission
+                TICK_EVENTS.push("drone.harvesting_complete", {
+                    "battery_id": drone.battery_id,
+                    "satellite_id": sat.satellite_id,
+                    "reason": "low" if sat_low else "full" if payload_full else "max_dwell"
+                })
+                _release_current_claim(drone)
+                _choose_next_mission(drone)
+                continue
+            
+            # Extract energy
+            available = max(0.0, sat.energy_amount - _HARVEST_FLOOR)
+            take = min(_DRONE_HARVEST_RATE,
+                      _DRONE_PAYLOAD_MAX - drone.battery,
+                      available)
+            
+            if take > 0:
+                drone.battery += take
+                old = sat.energy_amount
+                sat.energy_amount -= take
+                _flag_crossing(sat, old)
+                
+                # Process transaction - drone pays satellite
+                ECONOMICS.process_energy_transfer(
+                    from_sat=sat,
+                    to_drone=drone,
+                    amount=take,
+                    transfer_type="harvest",
+                    socketio=socketio
+                )
+                
+                TICK_EVENTS.push("drone.harvested", {
+                    "battery_id": drone.battery_id,
+                    "satellite_id": sat.satellite_id,
+                    "amount": take
+                })
+        
+        # Handle idle drones
+        if drone.status in ("standby", "at_earth") and not drone.target and _search_due(drone):
+            _choose_next_mission(drone)
\ No newline at end of file
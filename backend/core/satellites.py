@@ -1,59 +1,82 @@
 from . import state
 from config import CONFIG
-from events import emit_event
+from events import TICK_EVENTS
 import math, time
+import numpy as np
 
-def _daylight_factor(lat, lon, now_s):
+_TASK_ENERGY_RATE = CONFIG.TASK_ENERGY_RATE
+_TASK_PROGRESS_RATE = CONFIG.TASK_PROGRESS_RATE
+_NEEDY_THRESH = CONFIG.AUTO_NEEDY_THRESH
+
+def _daylight_curve(hrs):
     """
     Toy daylight model:
     local solar time ≈ UTC hours + lon/15.
     Daylight 06:00–18:00; cosine ramp to 0 at night.
     """
-    hrs = (now_s/3600.0 + lon/15.0) % 24.0
-    if 6.0 <= hrs <= 18.0:
-        # map 6->0, 12->1, 18->0 via cosine
-        x = (hrs - 12.0) / 6.0   # -1..+1
-        return max(0.0, math.cos(x * math.pi/2.0))  # 0..1
-    return 0.0
-
-def advance_tick(socketio):
+    # map 6->0, 12->1, 18->0 via cosine
+    x = (hrs - 12.0) / 6.0   # -1..+1
+    day = (hrs >= 6.0) & (hrs <= 18.0)
+    return np.where(day, np.maximum(0.0, np.cos(x * math.pi/2.0)), 0.0)  # 0..1
+
+# The curve sampled once per minute of local solar time; a satellite's
+# factor is then one table lookup instead of mod/cos arithmetic
+_DAYLIGHT_LUT = _daylight_curve(np.arange(1440) / 60.0)
+
+def _daylight_factors(lons, now_s):
+    """Daylight factor 0..1 at each longitude, to the minute, in one gather"""
+    return _DAYLIGHT_LUT[((now_s/60.0 + lons*4.0) % 1440.0).astype(np.intp)]
+
+def advance_tick_locked(socketio):
+    """Advance every satellite one tick; caller holds state.LOCK"""
     now = time.time()
-    with state.LOCK:
-        for s in state.SATELLITES.values():
-            # 1) Solar generation
-            lat, lon = s.position["lat"], s.position["lon"]
-            k = _daylight_factor(lat, lon, now)
-            gen = s.solar_gen_rate 
-            if gen > 0:
-                s.energy_amount = min(s.max_energy, s.energy_amount + gen)
-
-            # 2) Process tasks: consume only while working
-            completed = []
-            for t in s.current_tasks:
+    # Solar generation for every satellite at once, scaled by daylight
+    gens = (state.SAT_SOLAR * _daylight_factors(state.SAT_POS[:, 1], now)).tolist()
+    assigned = state.ASSIGNED
+    for s, gen in zip(state.SATELLITES.values(), gens):
+        # Energy is carried in a local through all three steps and written
+        # back once
+        energy = s.energy_amount
+
+        # 1) Solar generation
+        if gen > 0:
+            energy = min(s.max_energy, energy + gen)
+
+        # 2) Process tasks: consume only while working
+        tasks = s.current_tasks
+        if tasks:
+            kept = []
+            for t in tasks:
                 # energy burn per task this tick
-                need = min(CONFIG.TASK_ENERGY_RATE, t["remaining_energy"])
+                remaining = t["remaining_energy"]
+                need = min(_TASK_ENERGY_RATE, remaining)
                 # if no energy to burn, the task stalls (very slow crawl)
-                if s.energy_amount >= need and need > 0:
-                    s.energy_amount -= need
-                    t["remaining_energy"] -= need
-                    eff = 1.0
+                if energy >= need and need > 0:
+                    energy -= need
+                    remaining -= need
+                    t["remaining_energy"] = remaining
+                    step = _TASK_PROGRESS_RATE
                 else:
-                    eff = 0.2  # starved, crawl
+                    step = _TASK_PROGRESS_RATE * 0.2  # starved, crawl
 
                 # progress update
-                t["progress"] = min(1.0, t["progress"] + CONFIG.TASK_PROGRESS_RATE * eff)
-
-                if t["progress"] >= 1.0 or t["remaining_energy"] <= 0.0:
-                    completed.append(t)
-
-            for t in completed:
-                s.current_tasks.remove(t)
-                tid = t["task_id"]
-                state.ASSIGNED.pop(tid, None)
-                emit_event(socketio, "task.completed",
-                           {"task_id": tid, "satellite_id": s.satellite_id})
-
-            # 3) Alerts
-            if s.energy_amount < 10.0:
-                emit_event(socketio, "alert.low_energy",
-                           {"satellite_id": s.satellite_id, "energy": s.energy_amount})
+                progress = t["progress"] = min(1.0, t["progress"] + step)
+
+                if progress >= 1.0 or remaining <= 0.0:
+                    tid = t["task_id"]
+                    assigned.pop(tid, None)
+                    TICK_EVENTS.push("task.completed",
+                                     {"task_id": tid, "satellite_id": s.satellite_id})
+                else:
+                    kept.append(t)
+            if len(kept) != len(tasks):
+                tasks[:] = kept
+        # crossing the auto-dispatch line may open missions for idle drones
+        if (energy < _NEEDY_THRESH) != (s.energy_amount < _NEEDY_THRESH):
+            state.SATS_CHANGED = True
+        s.energy_amount = energy
+
+        # 3) Alerts
+        if energy < 10.0:
+            TICK_EVENTS.push("alert.low_energy",
+                             {"satellite_id": s.satellite_id, "energy": energy})
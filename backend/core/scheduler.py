@@ -1,27 +1,98 @@
-from . import delegator, satellites, orchestrator_batteries
+from . import delegator, satellites, orchestrator_batteries, state
+from .economics import ECONOMICS
 from config import CONFIG
-from events import emit_event
-import threading, time
+from events import emit_event, flush_tick_events
+import logging, threading, time
 
 _running = False
 _thread  = None
+_stop = threading.Event()   # set by stop(); wakes the loop out of its tick wait
+_MAX_LAG_TICKS = 5          # fall further behind than this and skip ahead
+_STATE_PUSH = CONFIG.STATE_PUSH_ENABLED
+
+class _RateLimitFilter(logging.Filter):
+    """Pass at most `per_second` records per error signature each second"""
+    def __init__(self, per_second=1):
+        super().__init__()
+        self.per_second = per_second
+        self._windows = {}  # (exc type, file, line) -> [window start, count]
+
+    def filter(self, record):
+        if not record.exc_info:
+            return True
+        etype, _, tb = record.exc_info
+        while tb and tb.tb_next:
+            tb = tb.tb_next
+        sig = (etype, tb.tb_frame.f_code.co_filename, tb.tb_lineno) if tb else (etype,)
+        now = time.monotonic()
+        window = self._windows.get(sig)
+        if window is None or now - window[0] >= 1.0:
+            self._windows[sig] = [now, 1]
+            return True
+        window[1] += 1
+        return window[1] <= self.per_second
+
+log = logging.getLogger("scheduler")
+log.addFilter(_RateLimitFilter())
 
 def _loop(socketio):
     tick_s = CONFIG.TICK_MS / 1000.0
+    # Tick i is due at start + i*tick_s, so the period doesn't stretch by
+    # however long the tick work took
+    start = time.perf_counter()
+    i = 0
     while _running:
         try:
-            delegator.assign_pending(socketio)
-            satellites.advance_tick(socketio)
-            orchestrator_batteries.route(socketio)
+            # one lock hold per tick; no API reader sees a half-applied tick
+            with state.LOCK:
+                state.TICK_COUNTER += 1
+                state.STATE_VERSION += 1
+                ECONOMICS.next_tick()
+                delegator.assign_pending_locked(socketio)
+                satellites.advance_tick_locked(socketio)
+                orchestrator_batteries.route_locked(socketio)
+                # nobody to push to: skip the diff; a client that connects
+                # bootstraps from /state, and the next delta still covers
+                # everything changed since the last one sent
+                delta = state.snapshot_delta() if _STATE_PUSH and state.SUBSCRIBERS else None
+            flush_tick_events(socketio)
+            if delta:
+                # one serialization per tick, fanned out to every client
+                socketio.emit("state.tick", delta)
             emit_event(socketio, "tick", {})
         except Exception as e:
-            # keep sim alive on transient errors
-            print("[scheduler] tick error:", e)
-        time.sleep(tick_s)
+            # Keep sim alive on transient errors; logging formats lazily and
+            # the filter drops repeats, so an error storm can't stall the loop
+            tick = state.TICK_COUNTER
+            with state.LOCK:
+                # new version so /state doesn't keep serving the pre-error body
+                state.LAST_TICK_ERROR = {"tick": tick, "error": repr(e), "at": time.time()}
+                state.STATE_VERSION += 1
+            log.exception("tick %d error", tick)
+        i += 1
+        deadline = start + i*tick_s
+        now = time.perf_counter()
+        if now < deadline:
+            _stop.wait(deadline - now)
+            continue
+        state.TICK_OVERRUNS += 1
+        if now - deadline > _MAX_LAG_TICKS*tick_s:
+            # hopelessly behind (e.g. a long stall): drop the missed ticks
+            # rather than burst through them
+            i = int((now - start) / tick_s)
 
 def start(socketio):
     global _running, _thread
     if _running: return
     _running = True
+    _stop.clear()
     _thread = threading.Thread(target=_loop, args=(socketio,), daemon=True)
     _thread.start()
+
+def stop():
+    global _running
+    if not _running: return
+    _running = False
+    _stop.set()
+    if _thread:
+        _thread.join(timeout=2.0)
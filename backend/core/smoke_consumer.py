@@ -4,29 +4,42 @@ from . import state
 
 _running = False
 _thread  = None
+_stop = threading.Event()   # set by stop_smoke(); wakes the loop out of its wait
 
 def _loop(qps, burst):
-    global _running
     period = 1.0 / max(qps, 1)
+    # batches are due on a fixed cadence, like the scheduler's ticks
+    next_at = time.perf_counter()
     while _running:
         n = random.randint(1, max(burst,1))
-        with state.LOCK:
-            for _ in range(n):
-                t = Task(
-                    energy_need=random.randint(5,15),
-                    processing_power_needed=random.randint(500,2000),
-                    priority=random.choice(["low","medium","high"])
-                )
-                state.TASK_QUEUE.append(t)
-        time.sleep(period)
+        batch = [
+            Task(
+                energy_need=random.randint(5,15),
+                processing_power_needed=random.randint(500,2000),
+                priority=random.choice(["low","medium","high"])
+            )
+            for _ in range(n)
+        ]
+        # TASK_QUEUE is thread-safe, so producing never waits on a tick
+        put = state.TASK_QUEUE.put_nowait
+        for t in batch:
+            put(t)
+        next_at = max(next_at + period, time.perf_counter())
+        _stop.wait(next_at - time.perf_counter())
 
 def start_smoke(qps=30, burst=10):
     global _running, _thread
     if _running: return
     _running = True
+    _stop.clear()
     _thread = threading.Thread(target=_loop, args=(qps, burst), daemon=True)
     _thread.start()
 
 def stop_smoke():
     global _running
+    if not _running: return
     _running = False
+    _stop.set()
+    # joined so a quick restart can't leave two producers running
+    if _thread:
+        _thread.join(timeout=2.0)
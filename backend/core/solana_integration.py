@@ -2,37 +2,55 @@
 Solana Devnet Integration - Records energy transactions on blockchain
 
 This module is OPTIONAL and isolated. If SOLANA_ENABLED=false, all methods are no-ops.
+The solana/solders SDK is imported only once enabled, so the simulation itself
+runs without it (e.g. on interpreters the SDK's native wheels don't support).
 """
 
-from solana.rpc.async_api import AsyncClient
-from solana.rpc.commitment import Confirmed
-from solana.transaction import Transaction
-from solders.keypair import Keypair
-from solders.system_program import transfer, TransferParams
-from solders.pubkey import Pubkey
-from solders.message import Message
 import json
 import os
 import time
 import asyncio
-from typing import Optional
+import threading
+from typing import Optional, TYPE_CHECKING
 from solana_config import SOLANA_CONFIG
 from events import emit_event
 
+if TYPE_CHECKING:
+    from solana.rpc.async_api import AsyncClient
+    from solders.keypair import Keypair
+
+# SPL Memo program; each record carries its transaction id as a memo
+_MEMO_PROGRAM_ID = "MemoSq4gqABAXKb96qnH8TysNcWxMyWCqXgDLGmfcHr"
+
 class SolanaIntegrator:
     def __init__(self):
         self.enabled = SOLANA_CONFIG.ENABLED
-        self.keypair: Optional[Keypair] = None
-        self.client: Optional[AsyncClient] = None
+        self.keypair: Optional["Keypair"] = None
+        self.client: Optional["AsyncClient"] = None
         self.last_transaction_time = 0
         self.pending_transactions = []
+        # Background event loop that records transactions, so RPC latency
+        # never lands on the simulation thread
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._blockhash = None
+        self._blockhash_at = 0.0
+        # Wallet balance, refreshed on the worker loop every
+        # BALANCE_REFRESH_SECONDS so /solana/status is a plain read
+        self.balance_cached: Optional[float] = None
+        self._balance_task: Optional[asyncio.Task] = None
         
         if self.enabled:
             self._initialize()
+        if self.enabled:
+            self._start_worker()
     
     def _initialize(self):
         """Initialize Solana connection and keypair"""
         try:
+            from solana.rpc.async_api import AsyncClient
+            from solders.keypair import Keypair
+
             # Load or create keypair
             if os.path.exists(SOLANA_CONFIG.KEYPAIR_PATH):
                 with open(SOLANA_CONFIG.KEYPAIR_PATH, 'r') as f:
@@ -54,6 +72,49 @@ class SolanaIntegrator:
             print(f"❌ Solana initialization failed: {e}")
             self.enabled = False
     
+    def _start_worker(self):
+        """Run the recording loop on a daemon thread"""
+        self._loop = asyncio.new_event_loop()
+        self._queue = asyncio.Queue()
+        threading.Thread(target=self._loop.run_until_complete, args=(self._worker(),),
+                         daemon=True, name="solana-worker").start()
+    
+    async def _worker(self):
+        self._balance_task = asyncio.create_task(self._refresh_balance())
+        while True:
+            transaction_data, socketio = await self._queue.get()
+            await self.record_transaction(transaction_data, socketio)
+    
+    async def _refresh_balance(self):
+        while True:
+            balance = await self.get_balance()
+            if balance is not None:
+                self.balance_cached = balance
+            await asyncio.sleep(SOLANA_CONFIG.BALANCE_REFRESH_SECONDS)
+    
+    def enqueue(self, transaction_data: dict, socketio) -> None:
+        """
+        Queue a transaction for recording on Solana Devnet
+        Non-blocking and safe to call from any thread; no-op when disabled
+        """
+        if self._loop is None:
+            return
+        # Below-threshold transactions would be dropped by the worker anyway
+        if transaction_data.get("total_cost", 0) < SOLANA_CONFIG.BATCH_THRESHOLD:
+            return
+        # asyncio.Queue isn't thread-safe; hand the put to the loop's thread
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (transaction_data, socketio))
+    
+    async def _latest_blockhash(self):
+        """Recent blockhash, reused for BLOCKHASH_TTL_SECONDS to save an RPC per transaction"""
+        now = time.time()
+        if self._blockhash is None or now - self._blockhash_at >= SOLANA_CONFIG.BLOCKHASH_TTL_SECONDS:
+            from solana.rpc.commitment import Confirmed
+            resp = await self.client.get_latest_blockhash(Confirmed)
+            self._blockhash = resp.value.blockhash
+            self._blockhash_at = now
+        return self._blockhash
+    
     async def record_transaction(self, transaction_data: dict, socketio) -> Optional[str]:
         """
         Record an energy transaction on Solana Devnet
@@ -79,6 +140,12 @@ class SolanaIntegrator:
             if amount_lamports < 1:
                 return None
             
+            from solana.transaction import Transaction
+            from solders.instruction import Instruction
+            from solders.message import Message
+            from solders.pubkey import Pubkey
+            from solders.system_program import transfer, TransferParams
+
             # Create transfer instruction (sending to self as a record)
             # In production, you'd send to the actual recipient's wallet
             transfer_ix = transfer(
@@ -89,13 +156,21 @@ class SolanaIntegrator:
                 )
             )
             
-            # Get recent blockhash
-            recent_blockhash_resp = await self.client.get_latest_blockhash(Confirmed)
-            recent_blockhash = recent_blockhash_resp.value.blockhash
+            # Self-transfers of equal amounts under one cached blockhash would
+            # be byte-identical, and the cluster drops duplicates; the memo
+            # makes each one unique
+            memo_ix = Instruction(
+                Pubkey.from_string(_MEMO_PROGRAM_ID),
+                str(transaction_data.get("transaction_id", now)).encode(),
+                []
+            )
+            
+            # Get recent blockhash (cached)
+            recent_blockhash = await self._latest_blockhash()
             
             # Create transaction
             msg = Message.new_with_blockhash(
-                [transfer_ix],
+                [transfer_ix, memo_ix],
                 self.keypair.pubkey(),
                 recent_blockhash
             )
@@ -121,6 +196,7 @@ class SolanaIntegrator:
             
         except Exception as e:
             print(f"⚠️  Solana transaction failed: {e}")
+            self._blockhash = None  # may have expired; fetch fresh next time
             return None
     
     async def get_balance(self) -> Optional[float]:
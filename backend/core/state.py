@@ -1,37 +1,212 @@
-from collections import deque
+from collections import Counter, defaultdict, deque
+from queue import SimpleQueue, Empty
 from threading import RLock
-from typing import Dict
+from typing import Dict, List, Optional
+import numpy as np
 from .models import Satellite, Battery, Task
+from utils.geo import geo_terms, haversine_km_cached
 
+# LOCK guards the compound invariants (drone counters and indexes, claims
+# vs. targets, the per-tick mutation pass) and is held once per tick. Lone
+# dict get/setdefault/pop calls and the TASK_QUEUE hand-off are atomic under
+# the GIL and are done without it.
 LOCK = RLock()
 SATELLITES: Dict[str, Satellite] = {}
 BATTERIES: Dict[str, Battery] = {}
-TASK_QUEUE = deque()
+TASK_QUEUE = SimpleQueue()   # producers put() here without taking LOCK
+PENDING_TASKS = deque()      # drained from TASK_QUEUE by the delegator, awaiting a satellite
 ASSIGNED: Dict[str, str] = {}
 CONFIG = None
 SOCKETIO = None
 SAT_CLAIM: dict[str, str] = {}  
+DRONE_STATUS: Counter = Counter()   # status -> number of drones currently in it
+# status -> {battery_id: drone}, in the order drones entered that status
+DRONES_BY_STATUS: Dict[str, Dict[str, Battery]] = defaultdict(dict)
+# Per-satellite drone counts, kept in step by set_drone_status/set_drone_target
+TARGETING_COUNT: Counter = Counter()    # satellite_id -> drones whose target is it
+CHARGING_COUNT: Counter = Counter()     # satellite_id -> drones charging it
+HARVESTING_COUNT: Counter = Counter()   # satellite_id -> drones harvesting it
+# Satellite positions as one (N, 3) lat/lon/alt array, row SAT_INDEX[satellite_id].
+# Satellites don't move once placed, so rows are written only by add_satellite.
+SAT_INDEX: Dict[str, int] = {}
+SAT_IDS: List[str] = []   # row -> satellite_id, the inverse of SAT_INDEX
+SAT_POS = np.empty((0, 3))
+SAT_SOLAR = np.empty(0)   # solar_gen_rate per row, for the vectorized solar step
+SAT_GEO = np.empty((0, 3))   # geo_terms per row, so distance queries skip the satellite-side trig
+TICK_COUNTER = 0   # ticks run so far, bumped by the scheduler loop under LOCK
+TICK_OVERRUNS = 0  # ticks whose work ran past the tick budget
+# Bumped under LOCK by anything that changes what snapshot() returns (every
+# tick, drone launches); /state uses it as its ETag
+STATE_VERSION = 0
+# Set when satellite supply changes (one added, or one crossing AUTO_NEEDY_THRESH
+# in the satellite tick or through drone charging/harvesting); route clears
+# every drone's mission-search backoff when it sees it
+SATS_CHANGED = False
+LAST_TICK_ERROR = None   # {"tick", "error", "at"} from the most recent failed tick
+SUBSCRIBERS = 0   # connected Socket.IO clients; the scheduler skips state.tick deltas at 0
 
 def snapshot():
     with LOCK:
         return dict(
             satellites=[s.model_dump() for s in SATELLITES.values()],
             batteries=[b.model_dump() for b in BATTERIES.values()],
-            queue=[t.model_dump() for t in list(TASK_QUEUE)],
-            assigned=ASSIGNED.copy()
+            queue=[t.model_dump() for t in PENDING_TASKS],
+            assigned=ASSIGNED.copy(),
+            health={"tick": TICK_COUNTER, "tick_overruns": TICK_OVERRUNS,
+                    "last_tick_error": LAST_TICK_ERROR}
         )
+# id -> dump_key() of the model as last sent by snapshot_delta(), plus the
+# queue/assigned it last sent, so each state.tick push carries only what
+# changed since the previous
+_LAST_PUSHED: Dict[str, list] = {}
+_LAST_PUSHED_QUEUE = []
+_LAST_PUSHED_ASSIGNED: Dict[str, str] = {}
+
+def snapshot_delta():
+    """snapshot() reduced to what changed since the last call; caller holds LOCK"""
+    global _LAST_PUSHED_QUEUE, _LAST_PUSHED_ASSIGNED
+    delta = {"version": STATE_VERSION, "satellites": [], "batteries": []}
+    for key, models in (("satellites", SATELLITES), ("batteries", BATTERIES)):
+        changed = delta[key]
+        # compare cheap field keys; only changed models are dumped
+        for mid, m in models.items():
+            k = m.dump_key()
+            if _LAST_PUSHED.get(mid) != k:
+                _LAST_PUSHED[mid] = k
+                changed.append(m.model_dump())
+    queue = [t.task_id for t in PENDING_TASKS]
+    if queue != _LAST_PUSHED_QUEUE:
+        _LAST_PUSHED_QUEUE = queue
+        delta["queue"] = [t.model_dump() for t in PENDING_TASKS]
+    if ASSIGNED != _LAST_PUSHED_ASSIGNED:
+        _LAST_PUSHED_ASSIGNED = ASSIGNED.copy()
+        delta["assigned"] = _LAST_PUSHED_ASSIGNED
+    return delta
+
 def init_globals(config, socketio):
     global CONFIG, SOCKETIO
     CONFIG = config
     SOCKETIO = socketio
 
+def drain_task_queue(limit=None) -> None:
+    """Move up to limit (default: all) submitted tasks onto PENDING_TASKS"""
+    get = TASK_QUEUE.get_nowait
+    n = 0
+    while limit is None or n < limit:
+        try:
+            PENDING_TASKS.append(get())
+        except Empty:
+            return
+        n += 1
+
+def clear_tasks() -> None:
+    drain_task_queue()
+    PENDING_TASKS.clear()
+
 def try_claim_sat(sat_id: str, battery_id: str) -> bool:
-    owner = SAT_CLAIM.get(sat_id)
-    if owner is None or owner == battery_id:
-        SAT_CLAIM[sat_id] = battery_id
-        return True
-    return False
+    # setdefault is a single dict op, atomic under the GIL, so the claim is
+    # a compare-and-set even without LOCK
+    return SAT_CLAIM.setdefault(sat_id, battery_id) == battery_id
 
 def release_sat(sat_id: str, battery_id: str) -> None:
+    # only the owner releases, so the check can't go stale before the pop
     if SAT_CLAIM.get(sat_id) == battery_id:
-        del SAT_CLAIM[sat_id]
\ No newline at end of file
+        SAT_CLAIM.pop(sat_id, None)
+
+def add_satellite(sat) -> None:
+    # rows follow SATELLITES insertion order, so the arrays zip with .values()
+    global SAT_POS, SAT_SOLAR, SAT_GEO, SATS_CHANGED
+    SATELLITES[sat.satellite_id] = sat
+    SAT_INDEX[sat.satellite_id] = len(SAT_POS)
+    SAT_IDS.append(sat.satellite_id)
+    SAT_POS = np.vstack([SAT_POS, (sat.lat, sat.lon, 0.0)])
+    SAT_SOLAR = np.append(SAT_SOLAR, sat.solar_gen_rate)
+    SAT_GEO = np.vstack([SAT_GEO, geo_terms(sat.lat, sat.lon)])
+    SATS_CHANGED = True
+
+def find_nearest_satellite(lat: float, lon: float) -> Optional[str]:
+    """satellite_id nearest to (lat, lon), or None with no satellites"""
+    if not SAT_IDS:
+        return None
+    return SAT_IDS[int(np.argmin(haversine_km_cached(lat, lon, SAT_GEO)))]
+
+def clear_satellites() -> None:
+    global SAT_POS, SAT_SOLAR, SAT_GEO
+    SATELLITES.clear()
+    SAT_INDEX.clear()
+    SAT_IDS.clear()
+    SAT_POS = np.empty((0, 3))
+    SAT_SOLAR = np.empty(0)
+    SAT_GEO = np.empty((0, 3))
+    _LAST_PUSHED.clear()
+
+def clear_batteries() -> None:
+    BATTERIES.clear()
+    _LAST_PUSHED.clear()
+    DRONE_STATUS.clear()
+    DRONES_BY_STATUS.clear()
+    TARGETING_COUNT.clear()
+    CHARGING_COUNT.clear()
+    HARVESTING_COUNT.clear()
+
+def _sat_counts(drone, delta: int) -> None:
+    """Add delta to the per-satellite counters drone currently contributes to"""
+    target = drone.target
+    sid = target.get("satellite_id") if target else None
+    if sid is None:
+        return
+    counters = [TARGETING_COUNT]
+    if drone.status == "charging":
+        counters.append(CHARGING_COUNT)
+    elif drone.status == "harvesting":
+        counters.append(HARVESTING_COUNT)
+    for c in counters:
+        n = c[sid] + delta
+        if n:
+            c[sid] = n
+        else:
+            del c[sid]
+
+def add_battery(drone) -> None:
+    BATTERIES[drone.battery_id] = drone
+    DRONE_STATUS[drone.status] += 1
+    DRONES_BY_STATUS[drone.status][drone.battery_id] = drone
+    _sat_counts(drone, 1)
+
+def set_drone_status(drone, status: str) -> None:
+    """Change a drone's status, keeping the status indexes and satellite counts in step"""
+    if drone.status == status:
+        return
+    _sat_counts(drone, -1)
+    DRONE_STATUS[drone.status] -= 1
+    DRONE_STATUS[status] += 1
+    del DRONES_BY_STATUS[drone.status][drone.battery_id]
+    DRONES_BY_STATUS[status][drone.battery_id] = drone
+    drone.status = status
+    _sat_counts(drone, 1)
+
+def set_drone_target(drone, target) -> None:
+    """Change a drone's target, keeping the satellite counts in step"""
+    _sat_counts(drone, -1)
+    drone.target = target
+    _sat_counts(drone, 1)
+
+def verify_drone_counts() -> None:
+    """Recount every maintained drone counter from scratch and assert they match"""
+    status, targeting, charging, harvesting = Counter(), Counter(), Counter(), Counter()
+    for b in BATTERIES.values():
+        status[b.status] += 1
+        sid = b.target.get("satellite_id") if b.target else None
+        if sid is not None:
+            targeting[sid] += 1
+            if b.status == "charging":
+                charging[sid] += 1
+            elif b.status == "harvesting":
+                harvesting[sid] += 1
+    assert +DRONE_STATUS == status, (DRONE_STATUS, status)
+    for st, drones in DRONES_BY_STATUS.items():
+        assert all(d.status == st for d in drones.values()), st
+        assert len(drones) == status[st], (st, len(drones), status[st])
+    assert TARGETING_COUNT == targeting, (TARGETING_COUNT, targeting)
+    assert CHARGING_COUNT == charging, (CHARGING_COUNT, charging)
+    assert HARVESTING_COUNT == harvesting, (HARVESTING_COUNT, harvesting)
@@ -1,13 +1,53 @@
 from collections import deque
+from itertools import islice
+import threading
+import orjson
 
 _EVENT_LOG = deque(maxlen=2000)
 
+class OrjsonCodec:
+    """json-module shim so Socket.IO encodes packets with orjson"""
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        return orjson.loads(s)
+
 def emit_event(socketio, event_type, payload):
     rec = {"type": event_type, "payload": payload}
     _EVENT_LOG.append(rec)
     socketio.emit(event_type, payload)  # default namespace '/'
 
+class EventBuffer:
+    """Collects high-rate events so a tick goes out as one 'tick_batch' frame"""
+    def __init__(self):
+        self._events = []
+        self._lock = threading.Lock()
+
+    def push(self, event_type, payload):
+        rec = {"type": event_type, "payload": payload}
+        _EVENT_LOG.append(rec)
+        with self._lock:
+            self._events.append(rec)
+
+    def drain(self):
+        with self._lock:
+            events, self._events = self._events, []
+        return events
+
+TICK_EVENTS = EventBuffer()
+
+def flush_tick_events(socketio):
+    batch = TICK_EVENTS.drain()
+    if batch:
+        socketio.emit("tick_batch", batch)
+
 def dump_events(limit=200):
-    # newest last
-    start = max(0, len(_EVENT_LOG) - limit)
-    return list(_EVENT_LOG)[start:]
+    # newest last; walk the deque from its right end so only the kept
+    # records are touched, instead of copying the whole log to slice it
+    n = min(max(limit, 0), len(_EVENT_LOG))
+    out = list(islice(reversed(_EVENT_LOG), n))
+    out.reverse()
+    return out
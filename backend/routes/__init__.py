@@ -0,0 +1,19 @@
+import orjson
+from flask import Response, abort, request
+from pydantic import ValidationError
+
+_ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def json_dumps(obj) -> bytes:
+    return orjson.dumps(obj, option=_ORJSON_OPTS)
+
+def json_response(obj, status=200):
+    """jsonify() via orjson, for the big read endpoints (state snapshots etc.)"""
+    return Response(json_dumps(obj), status=status, mimetype="application/json")
+
+def load_json(model):
+    """Parse and validate the request body as `model` in one pydantic-core pass; 400 if invalid"""
+    try:
+        return model.model_validate_json(request.get_data(cache=False))
+    except ValidationError as e:
+        abort(json_response({"error": e.errors(include_url=False, include_context=False, include_input=False)}, 400))
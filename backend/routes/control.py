@@ -1,7 +1,8 @@
+from itertools import islice
 from core import state
 from core.models import Battery
-from utils.geo import haversine_km
-from events import emit_event
+from utils.geo import haversine_km_batch
+from events import TICK_EVENTS
 from flask import jsonify, request, Blueprint
 
 bp = Blueprint("control", __name__)
@@ -10,38 +11,54 @@ bp = Blueprint("control", __name__)
 def launch():
     """
     body: { "count": 1, "target_satellite_id": "sat-..." }
-    Launches 'count' drones from Earth, aiming first at target_satellite_id.
+    Launches 'count' drones from Earth, aiming first at target_satellite_id
+    (default: the satellite nearest the Earth launch site).
     """
     data = request.get_json(force=True)
-    count = int(data.get("count", 1))
+    # a non-positive count launches nothing (islice below rejects negatives)
+    count = max(0, int(data.get("count", 1)))
     target = data.get("target_satellite_id")
+    if target is None:
+        target = state.find_nearest_satellite(0.0, 0.0)
+    # a single dict get is atomic and satellites are never removed while
+    # running, so a bad target fails fast without waiting out a tick
+    sat = state.SATELLITES.get(target)
+    if not sat:
+        return jsonify({"error":"target satellite not found"}), 404
+    # loop invariants; the hasattr() fallbacks never fired (state.CONFIG
+    # always exists, None until init_globals)
+    cfg = state.CONFIG
+    reserve = cfg.DRONE_RESERVE_MAX if cfg else 60.0
+    payload = cfg.DRONE_PAYLOAD_MAX if cfg else 100.0
+    speed = cfg.DRONE_SPEED_KM_PER_TICK if cfg else 4000
+    sat_id = sat.satellite_id
     with state.LOCK:
-        sat = state.SATELLITES.get(target)
-        if not sat:
-            return jsonify({"error":"target satellite not found"}), 404
-        launched = []
-        for _ in range(count):
-            # pick an available or create a new drone at Earth
-            drone = None
-            for b in state.BATTERIES.values():
-                if b.status == "at_earth":
-                    drone = b; break
-            if not drone:
-                drone = Battery(
-                    reserve_battery=state.CONFIG.DRONE_RESERVE_MAX if hasattr(state, "CONFIG") else 60.0,
-                    battery=state.CONFIG.DRONE_PAYLOAD_MAX if hasattr(state, "CONFIG") else 100.0
-                )
-                state.BATTERIES[drone.battery_id] = drone
+        # idle drones at Earth go first, collected in one pass up front (the
+        # status index drops each as it leaves at_earth); the rest are new
+        idle = list(islice(state.DRONES_BY_STATUS["at_earth"].values(), count))
+        drones = []
+        for i in range(count):
+            if i < len(idle):
+                drone = idle[i]
+            else:
+                drone = Battery(reserve_battery=reserve, battery=payload)
+                state.add_battery(drone)
             # set departure
-            drone.status = "enroute"
-            drone.target = {"satellite_id": sat.satellite_id}
-            drone.speed_km_per_tick = state.CONFIG.DRONE_SPEED_KM_PER_TICK
-            # compute ETA crudely
-            d_km = haversine_km(drone.position["lat"], drone.position["lon"], sat.position["lat"], sat.position["lon"])
-            ticks = max(1, int(d_km / drone.speed_km_per_tick))
+            state.set_drone_status(drone, "enroute")
+            state.set_drone_target(drone, {"satellite_id": sat_id})
+            drone.speed_km_per_tick = speed
+            drones.append(drone)
+        # compute ETAs crudely, every launched drone in one distance pass
+        d_kms = haversine_km_batch(sat.lat, sat.lon,
+                                   [d.lat for d in drones], [d.lon for d in drones]).tolist()
+        state.STATE_VERSION += 1
+        launched = []
+        for drone, d_km in zip(drones, d_kms):
+            ticks = max(1, int(d_km / speed))
             drone.eta_ticks = ticks
             launched.append(drone.battery_id)
-            emit_event(state.SOCKETIO, "drone.launched", {
+            # goes out with the next tick_batch rather than one emit per drone
+            TICK_EVENTS.push("drone.launched", {
                 "battery_id": drone.battery_id, "target": drone.target, "eta": ticks
             })
     return jsonify({"ok": True, "launched": launched})
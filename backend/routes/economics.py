@@ -1,4 +1,6 @@
-from flask import Blueprint, jsonify
+from operator import attrgetter
+from flask import Blueprint
+from routes import json_response
 from core.economics import ECONOMICS
 
 bp = Blueprint("economics", __name__)
@@ -6,34 +8,28 @@ bp = Blueprint("economics", __name__)
 @bp.get("/economics/metrics")
 def get_metrics():
     """Get comprehensive economic metrics"""
-    return jsonify(ECONOMICS.get_metrics())
+    return json_response(ECONOMICS.get_metrics())
+
+# wire key -> Transaction attribute, fetched in one attrgetter call per row
+_TX_KEYS = ("id", "timestamp", "from_company", "from_wallet", "to_company",
+            "to_wallet", "energy", "price_per_unit", "total_sol", "type")
+_TX_GETTER = attrgetter("transaction_id", "timestamp", "from_company", "from_wallet",
+                        "to_company", "to_wallet", "energy_amount", "price_per_unit",
+                        "total_cost", "transaction_type")
 
 @bp.get("/economics/transactions")
 def get_transactions():
     """Get recent transactions"""
-    return jsonify({
-        "transactions": [
-            {
-                "id": t.transaction_id,
-                "timestamp": t.timestamp,
-                "from_company": t.from_company,
-                "from_wallet": t.from_wallet,
-                "to_company": t.to_company,
-                "to_wallet": t.to_wallet,
-                "energy": t.energy_amount,
-                "price_per_unit": t.price_per_unit,
-                "total_sol": t.total_cost,
-                "type": t.transaction_type
-            }
-            for t in list(ECONOMICS.transactions)[-50:]
-        ]
+    return json_response({
+        "transactions": [dict(zip(_TX_KEYS, _TX_GETTER(t)))
+                         for t in ECONOMICS.transactions.recent(50)]
     })
 
 @bp.get("/economics/leaderboard")
 def get_leaderboard():
     """Get top earners and spenders"""
     metrics = ECONOMICS.get_metrics()
-    return jsonify({
+    return json_response({
         "top_earners": metrics["top_earning_satellites"],
         "top_spenders": metrics["top_spending_drones"],
         "total_volume": metrics["total_volume_sol"]
@@ -1,12 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
+from pydantic import BaseModel
 from core.smoke_consumer import start_smoke, stop_smoke
+from routes import load_json
 
 bp = Blueprint("smoke", __name__)
 
+class SmokeCfg(BaseModel):
+    qps: float = 30
+    burst: int = 10
+
 @bp.post("/smoke/start")
 def start():
-    cfg = request.get_json(force=True)
-    start_smoke(qps=cfg.get("qps", 30), burst=cfg.get("burst", 10))
+    cfg = load_json(SmokeCfg)
+    start_smoke(qps=cfg.qps, burst=cfg.burst)
     return jsonify({"ok": True})
 
 @bp.post("/smoke/stop")
@@ -1,6 +1,6 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint
+from routes import json_response
 from core.solana_integration import SOLANA
-import asyncio
 
 bp = Blueprint("solana", __name__)
 
@@ -8,36 +8,28 @@ bp = Blueprint("solana", __name__)
 def get_status():
     """Check if Solana integration is enabled and connected"""
     if not SOLANA.enabled:
-        return jsonify({
+        return json_response({
             "enabled": False,
             "message": "Solana integration disabled. Set SOLANA_ENABLED=true to enable."
         })
     
-    # Get balance asynchronously
-    try:
-        balance = asyncio.run(SOLANA.get_balance())
-        return jsonify({
-            "enabled": True,
-            "connected": SOLANA.client is not None,
-            "wallet_address": str(SOLANA.keypair.pubkey()) if SOLANA.keypair else None,
-            "balance_sol": balance,
-            "network": "devnet",
-            "faucet_url": "https://faucet.solana.com"
-        })
-    except Exception as e:
-        return jsonify({
-            "enabled": True,
-            "connected": False,
-            "error": str(e)
-        }), 500
+    # Balance is polled in the background on the Solana worker loop
+    return json_response({
+        "enabled": True,
+        "connected": SOLANA.client is not None,
+        "wallet_address": str(SOLANA.keypair.pubkey()) if SOLANA.keypair else None,
+        "balance_sol": SOLANA.balance_cached,
+        "network": "devnet",
+        "faucet_url": "https://faucet.solana.com"
+    })
 
 @bp.get("/solana/wallet")
 def get_wallet():
     """Get wallet address for funding"""
     if not SOLANA.enabled or not SOLANA.keypair:
-        return jsonify({"error": "Solana not enabled"}), 400
+        return json_response({"error": "Solana not enabled"}, 400)
     
-    return jsonify({
+    return json_response({
         "address": str(SOLANA.keypair.pubkey()),
         "faucet_url": f"https://faucet.solana.com/?address={SOLANA.keypair.pubkey()}",
         "explorer_url": f"https://explorer.solana.com/address/{SOLANA.keypair.pubkey()}?cluster=devnet"
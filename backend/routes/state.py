@@ -1,8 +1,32 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, request
+from core import state
 from core.state import snapshot
+from routes import json_dumps
 
 bp = Blueprint("state", __name__)
 
+# (STATE_VERSION, body) of the last snapshot served; polls between ticks
+# reuse it instead of rebuilding and re-serializing the snapshot
+_CACHED = (None, None)
+
+def state_response():
+    """Snapshot response with a weak ETag of STATE_VERSION; 304 when unchanged"""
+    global _CACHED
+    with state.LOCK:
+        version = state.STATE_VERSION
+        body = _CACHED[1] if _CACHED[0] == version else None
+        snap = snapshot() if body is None else None
+    etag = str(version)
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    else:
+        if body is None:
+            body = json_dumps(snap)   # outside LOCK; the tick needn't wait on it
+            _CACHED = (version, body)
+        resp = Response(body, mimetype="application/json")
+    resp.set_etag(etag, weak=True)
+    return resp
+
 @bp.get("/state")
 def get_state():
-    return jsonify(snapshot())
+    return state_response()
@@ -1,18 +1,36 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint
+from routes import json_response, load_json
+from pydantic import BaseModel, field_validator
+from typing import Optional
 from core.models import Task
 from core import state
-from core.state import snapshot
+from routes.state import state_response
 
 bp = Blueprint("tasks", __name__)
 
+class TaskIn(BaseModel):
+    """Validated request body; the sim-side Task is a plain dataclass"""
+    task_id: Optional[str] = None
+    energy_need: float
+    processing_power_needed: float
+    priority: str
+    created_at: Optional[float] = None
+
+    @field_validator("task_id")
+    @classmethod
+    def _not_generated(cls, v):
+        # uid() hands out "task-<n>" in sequence, so a client id in that
+        # space could collide with a generated one and clobber its ASSIGNED entry
+        if v is not None and v.startswith("task-"):
+            raise ValueError("task_id must not use the generated 'task-' prefix")
+        return v
+
 @bp.post("/tasks")
 def create_task():
-    data = request.get_json(force=True)
-    t = Task(**data)
-    with state.LOCK:
-        state.TASK_QUEUE.append(t)
-    return jsonify(t.model_dump())
+    t = Task(**load_json(TaskIn).model_dump(exclude_none=True))
+    state.TASK_QUEUE.put(t)   # thread-safe; the delegator drains it each tick
+    return json_response(t.model_dump())
 
 @bp.get("/state")
 def get_state():
-    return jsonify(snapshot())
\ No newline at end of file
+    return state_response()
@@ -1,46 +1,50 @@
-from core.models import Satellite, Battery
+from core.models import Satellite, Battery, SAT_COMPANIES, DRONE_COMPANIES
 from core import state
 from config import CONFIG
 import random
+import numpy as np
 
-def seed_state():
-    """Initialize simulation with satellites and 2 standby drones"""
+def seed_state(force=False):
+    """Initialize simulation with satellites and 2 standby drones
     
-    # Create satellites with varied energy levels
+    No-op if the state is already seeded, unless force=True (reset).
+    """
+    if state.SATELLITES and not force:
+        return
+    
+    # Create satellites with varied energy levels; names, positions and
+    # base prices are drawn in batches (one numpy draw per column) and
+    # passed in, so the per-object random defaults never run
+    sat_specs = [
+        # (energy_amount, processing_capacity, solar_gen_rate)
+        (90, 2500, 0.45),
+        (65, 1800, 0.35),
+        (40, 2200, 0.40),
+        (75, 2000, 0.38),
+    ]
+    n = len(sat_specs)
+    names = random.choices(SAT_COMPANIES, k=n)
+    # seeded from `random`, so random.seed() still fixes the whole layout
+    rng = np.random.default_rng(random.getrandbits(64))
+    # Randomize satellite positions and set varied base pricing
+    lats = rng.uniform(-60, 60, n).tolist()
+    lons = rng.uniform(-180, 180, n).tolist()
+    prices = rng.uniform(0.03, 0.08, n).tolist()
     sats = [
         Satellite(
-            energy_amount=90, 
-            max_energy=120,
-            processing_capacity=2500, 
-            solar_gen_rate=0.45
-        ),
-        Satellite(
-            energy_amount=65, 
-            max_energy=120,
-            processing_capacity=1800, 
-            solar_gen_rate=0.35
-        ),
-        Satellite(
-            energy_amount=40, 
-            max_energy=120,
-            processing_capacity=2200, 
-            solar_gen_rate=0.40
-        ),
-        Satellite(
-            energy_amount=75, 
+            energy_amount=energy,
             max_energy=120,
-            processing_capacity=2000, 
-            solar_gen_rate=0.38
-        ),
+            processing_capacity=capacity,
+            solar_gen_rate=gen,
+            company_name=name,
+            lat=lat,
+            lon=lon,
+            energy_price_per_unit=price
+        )
+        for (energy, capacity, gen), name, lat, lon, price
+        in zip(sat_specs, names, lats, lons, prices)
     ]
     
-    # Randomize satellite positions
-    for s in sats:
-        s.position["lon"] = random.uniform(-180, 180)
-        s.position["lat"] = random.uniform(-60, 60)
-        # Set varied base pricing
-        s.energy_price_per_unit = random.uniform(0.03, 0.08)
-    
     # Create 2 standby drones at Earth (ready for auto-dispatch)
     bats = [
         Battery(
@@ -48,31 +52,25 @@ def seed_state():
             battery=CONFIG.DRONE_PAYLOAD_MAX,
             speed_km_per_tick=CONFIG.DRONE_SPEED_KM_PER_TICK,
             status="at_earth",
-            position={"lat": 0.0, "lon": 0.0, "alt": 0.0},
-            home_base={"lat": 0.0, "lon": 0.0, "alt": 0.0}
-        ),
-        Battery(
-            reserve_battery=CONFIG.DRONE_RESERVE_MAX,
-            battery=CONFIG.DRONE_PAYLOAD_MAX,
-            speed_km_per_tick=CONFIG.DRONE_SPEED_KM_PER_TICK,
-            status="at_earth",
-            position={"lat": 0.0, "lon": 0.0, "alt": 0.0},
-            home_base={"lat": 0.0, "lon": 0.0, "alt": 0.0}
-        ),
+            lat=0.0, lon=0.0, alt=0.0,
+            home_lat=0.0, home_lon=0.0, home_alt=0.0,
+            company_name=name
+        )
+        for name in random.choices(DRONE_COMPANIES, k=2)
     ]
     
     # Clear and populate state
     with state.LOCK:
-        state.SATELLITES.clear()
-        state.BATTERIES.clear()
-        state.TASK_QUEUE.clear()
+        state.clear_satellites()
+        state.clear_batteries()
+        state.clear_tasks()
         state.ASSIGNED.clear()
         state.SAT_CLAIM.clear()
         
         for s in sats:
-            state.SATELLITES[s.satellite_id] = s
+            state.add_satellite(s)
         
         for b in bats:
-            state.BATTERIES[b.battery_id] = b
+            state.add_battery(b)
     
     print(f"✓ Seeded {len(sats)} satellites and {len(bats)} standby drones")
\ No newline at end of file
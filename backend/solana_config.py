@@ -20,5 +20,7 @@ class SolanaConfig:
     MIN_TRANSACTION_INTERVAL: float = 2.0  # seconds between transactions
     BATCH_TRANSACTIONS: bool = True  # Batch small transactions
     BATCH_THRESHOLD: float = 1.0  # Only send transactions >= 0.001 SOL
+    BLOCKHASH_TTL_SECONDS: float = 20.0  # Reuse a fetched blockhash; well inside its ~60s (150 block) validity
+    BALANCE_REFRESH_SECONDS: float = 5.0  # Wallet balance poll period for /solana/status
 
 SOLANA_CONFIG = SolanaConfig()
\ No newline at end of file
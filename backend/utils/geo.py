@@ -1,12 +1,40 @@
 import math
+from functools import lru_cache
+import numpy as np
 
 EARTH_RADIUS_KM = 6371.0
 
 def haversine_km(lat1, lon1, lat2, lon2):
-    rlat1, rlon1 = math.radians(lat1), math.radians(lon1)
-    rlat2, rlon2 = math.radians(lat2), math.radians(lon2)
-    dlat = rlat2 - rlat1
-    dlon = rlon2 - rlon1
-    a = math.sin(dlat/2)**2 + math.cos(rlat1)*math.cos(rlat2)*math.sin(dlon/2)**2
-    c = 2*math.atan2(math.sqrt(a), math.sqrt(1-a))
-    return EARTH_RADIUS_KM * c
+    rlat1, rlat2 = math.radians(lat1), math.radians(lat2)
+    sdlat = math.sin((rlat2 - rlat1) * 0.5)
+    sdlon = math.sin(math.radians(lon2 - lon1) * 0.5)
+    a = sdlat*sdlat + math.cos(rlat1)*math.cos(rlat2)*sdlon*sdlon
+    # 2·asin(√a) == 2·atan2(√a, √(1-a)); min() guards overshoot at antipodes
+    return 2.0*EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+
+# haversine_km memoized on exact coordinates, for legs between fixed points
+# (drones sit exactly at a satellite's or home's coordinates between legs)
+haversine_km_lru = lru_cache(maxsize=4096)(haversine_km)
+
+
+def geo_terms(lats, lons):
+    """(N, 3) rows of lat radians, lon radians and cos(lat) for haversine_km_cached"""
+    rlats = np.radians(lats)
+    return np.column_stack((rlats, np.radians(lons), np.cos(rlats)))
+
+
+def haversine_km_cached(lat, lon, terms):
+    """haversine_km from one point to points whose geo_terms are precomputed"""
+    rlat1, rlon1 = math.radians(lat), math.radians(lon)
+    sdlat = np.sin((terms[:, 0] - rlat1) * 0.5)
+    sdlon = np.sin((terms[:, 1] - rlon1) * 0.5)
+    a = sdlat*sdlat + math.cos(rlat1)*terms[:, 2]*(sdlon*sdlon)
+    # 2·atan2(√a, √(1-a)) == 2·asin(√a); one ufunc instead of three
+    # (the clip guards float overshoot past 1 at antipodes)
+    return (2.0*EARTH_RADIUS_KM) * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def haversine_km_batch(lat, lon, lats, lons):
+    """haversine_km from one point to arrays of points, as an ndarray"""
+    return haversine_km_cached(lat, lon, geo_terms(lats, lons))
@@ -1,7 +1,53 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+def _walk(top, exclude_dirs):
+    """os.walk(top) top-down as (root, file DirEntries), skipping exclude_dirs
+
+    Same order and symlink handling as os.walk, but the files come back as
+    the DirEntry objects scandir already built, so callers needn't re-stat
+    by path.
+    """
+    stack = [top]
+    while stack:
+        root = stack.pop()
+        try:
+            with os.scandir(root) as it:
+                entries = list(it)
+        except OSError:
+            continue  # os.walk skips unreadable directories too
+        dirs, files = [], []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            (dirs if is_dir else files).append(entry)
+        yield root, files
+        # reversed so the pops visit subdirectories in listing order;
+        # symlinked directories are listed but not followed, as in os.walk
+        stack.extend(d.path for d in reversed(dirs)
+                     if d.name not in exclude_dirs and not d.is_symlink())
+
+def _read_file(file_path, max_lines):
+    """One file's block of output (or its error line), ready to write"""
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            # Limit lines; only the kept lines are held, the rest just counted
+            content_lines = list(islice(f, max_lines))
+            extra = sum(1 for _ in f)
+        
+        block = f"\n--- FILE: {file_path} ---\n" + ''.join(content_lines)
+        if extra:
+            block += f"\n[... truncated {extra} lines ...]\n"
+        return block + "\n--- END OF FILE ---\n\n"
+    except Exception as e:
+        return f"[Error reading {file_path}: {e}]\n"
 
 def flatten_directory(source_dir, output_file="flattened_output.txt", include_exts=None, 
-                     exclude_exts=None, exclude_dirs=None, max_file_size=500_000, max_lines=300):
+                     exclude_exts=None, exclude_dirs=None, max_file_size=500_000, max_lines=300,
+                     max_workers=32):
     """
     Flattens a directory by writing all file contents and paths into a single text file.
 
@@ -13,6 +59,7 @@ def flatten_directory(source_dir, output_file="flattened_output.txt", include_ex
         exclude_dirs (list[str], optional): Directory names to skip (e.g., ['node_modules', 'venv', '__pycache__']).
         max_file_size (int): Skip files larger than this (in bytes).
         max_lines (int): Maximum number of lines to include per file (default 300).
+        max_workers (int): Threads reading files concurrently (default 32).
     """
     # Default directories to exclude
     if exclude_dirs is None:
@@ -23,50 +70,43 @@ def flatten_directory(source_dir, output_file="flattened_output.txt", include_ex
     if exclude_exts is None:
         exclude_exts = ['.pyc', '.pyo', '.pyd', '.so', '.dll', '.dylib', '.exe']
     
-    with open(output_file, "w", encoding="utf-8") as out:
-        out.write(f"Flattened view of: {os.path.abspath(source_dir)}\n")
-        out.write("=" * 80 + "\n\n")
+    # Walk first, recording the output as text pieces plus the files to read
+    # in their slots; the reads then run in a thread pool (they're I/O bound)
+    # and the pieces are written back in walk order
+    pieces = []
+    reads = []
+    for root, entries in _walk(source_dir, exclude_dirs):
+        rel_path = os.path.relpath(root, source_dir)
+        pieces.append(f"\n📁 Directory: {rel_path}\n" + "-" * 80 + "\n")
+
+        for entry in entries:
+            file = entry.name
+            file_path = entry.path
+            ext = os.path.splitext(file)[1].lower()
 
-        for root, dirs, files in os.walk(source_dir):
-            # Skip excluded directories
-            dirs[:] = [d for d in dirs if d not in exclude_dirs]
-            
-            rel_path = os.path.relpath(root, source_dir)
-            out.write(f"\n📁 Directory: {rel_path}\n")
-            out.write("-" * 80 + "\n")
+            # Extension filtering
+            if include_exts and ext not in include_exts:
+                continue
+            if exclude_exts and ext in exclude_exts:
+                continue
 
-            for file in files:
-                file_path = os.path.join(root, file)
-                ext = os.path.splitext(file)[1].lower()
+            # Skip large files (only stat what passed the extension filters)
+            if entry.stat().st_size > max_file_size:
+                pieces.append(f"[Skipped: {file} — too large]\n")
+                continue
 
-                # Extension filtering
-                if include_exts and ext not in include_exts:
-                    continue
-                if exclude_exts and ext in exclude_exts:
-                    continue
+            reads.append((len(pieces), file_path))
+            pieces.append(None)
 
-                # Skip large files
-                if os.path.getsize(file_path) > max_file_size:
-                    out.write(f"[Skipped: {file} — too large]\n")
-                    continue
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        blocks = pool.map(_read_file, [p for _, p in reads], [max_lines] * len(reads))
+        for (slot, _), block in zip(reads, blocks):
+            pieces[slot] = block
 
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        lines = f.readlines()
-                    
-                    # Limit lines
-                    truncated = len(lines) > max_lines
-                    content_lines = lines[:max_lines]
-                    
-                    out.write(f"\n--- FILE: {file_path} ---\n")
-                    out.write(''.join(content_lines))
-                    
-                    if truncated:
-                        out.write(f"\n[... truncated {len(lines) - max_lines} lines ...]\n")
-                    
-                    out.write("\n--- END OF FILE ---\n\n")
-                except Exception as e:
-                    out.write(f"[Error reading {file_path}: {e}]\n")
+    with open(output_file, "w", encoding="utf-8", buffering=1 << 20) as out:
+        out.write(f"Flattened view of: {os.path.abspath(source_dir)}\n")
+        out.write("=" * 80 + "\n\n")
+        out.writelines(pieces)
 
     print(f"\n✅ Flattened directory written to: {output_file}")
 
@@ -79,6 +119,7 @@ if __name__ == "__main__":
     parser.add_argument("--exclude", nargs="*", help="File extensions to exclude")
     parser.add_argument("--exclude-dirs", nargs="*", help="Directory names to skip")
     parser.add_argument("--max-lines", type=int, default=300, help="Max lines per file (default 300)")
+    parser.add_argument("--workers", type=int, default=32, help="Concurrent file reads (default 32)")
     args = parser.parse_args()
 
     flatten_directory(
@@ -87,5 +128,6 @@ if __name__ == "__main__":
         include_exts=args.include,
         exclude_exts=args.exclude,
         exclude_dirs=args.exclude_dirs,
-        max_lines=args.max_lines
+        max_lines=args.max_lines,
+        max_workers=args.workers
     )
\ No newline at end of file